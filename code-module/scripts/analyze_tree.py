@@ -6,13 +6,19 @@ Generates directory tree structure and identifies leaf directories
 for module analysis.
 """
 
+import functools
+import io
 import os
+import stat
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Tuple, Set
+from typing import List, Dict, Tuple, Set, Iterator, Iterable
 
 
 # Common directories to ignore
-IGNORED_DIRS = {
+IGNORED_DIRS = frozenset({
     'node_modules',
     '.git',
     '__pycache__',
@@ -29,104 +35,233 @@ IGNORED_DIRS = {
     '.pytest_cache',
     'coverage',
     '.mypy_cache',
-}
+})
 
 # Code file extensions to consider
-CODE_EXTENSIONS = {
+CODE_EXTENSIONS = frozenset({
     '.py', '.js', '.ts', '.tsx', '.jsx',
     '.java', '.go', '.rs', '.cpp', '.c', '.cs',
     '.rb', '.php', '.swift', '.kt', '.scala',
     '.sh', '.bash', '.zsh',
-}
+})
 
+# Same extensions as a tuple, for a single C-level str.endswith() prefilter
+_CODE_EXT_TUPLE = tuple(sorted(CODE_EXTENSIONS))
 
-def is_ignored_dir(path: Path) -> bool:
-    """Check if directory should be ignored."""
-    return any(part in IGNORED_DIRS for part in path.parts)
+# Upper bound for threads reading code files in parallel
+MAX_ANALYSIS_WORKERS = 32
 
+# Bytes read from the start of each code file during content analysis
+CODE_SAMPLE_BYTES = 8192
 
-def find_all_directories(root: Path) -> List[Path]:
-    """Find all non-ignored directories recursively."""
-    directories = []
 
-    for dirpath, dirnames, filenames in os.walk(root):
-        dir_path = Path(dirpath)
+@functools.lru_cache(maxsize=None)
+def _root_prefix(root_str: str) -> str:
+    """Prefix that every path under root_str starts with ('' for '.')."""
+    if root_str == os.curdir:
+        return ''
+    return root_str.rstrip(os.sep) + os.sep
+
+
+def relative_posix(dir_path: Path, root: Path) -> str:
+    """
+    Return dir_path relative to root as a '/'-joined string ('' for root).
+
+    Uses plain string slicing instead of Path.relative_to(), which builds
+    a new path object and re-splits its parts on every call.
+    """
+    path_str = os.fspath(dir_path)
+    root_str = os.fspath(root)
+    if path_str == root_str:
+        return ''
+    prefix = _root_prefix(root_str)
+    if path_str.startswith(prefix) and (prefix or not os.path.isabs(path_str)):
+        return path_str[len(prefix):].replace(os.sep, '/')
+    # Mixed path forms: fall back to pathlib (raises ValueError if not under root)
+    relative = dir_path.relative_to(root).as_posix()
+    return '' if relative == '.' else relative
+
+
+def _walk_directories(root_str: str) -> Iterator[Tuple[str, int, int, Tuple[str, ...]]]:
+    """
+    Yield (path_str, parent_index, depth, lowercased parts) in sorted pre-order.
 
-        # Skip if any parent directory is ignored
-        if is_ignored_dir(dir_path):
+    Works on plain strings only; parent_index is the position of the parent
+    in the yielded sequence (-1 for the root).
+    """
+    # Explicit stack; children are pushed in reverse sorted order so they come
+    # out in sorted pre-order. Each child extends its parent's parts with one
+    # lowered name, so analyze_by_path never has to re-split or re-lower a path.
+    stack: List[Tuple[str, int, int, Tuple[str, ...]]] = [(root_str, -1, 0, ())]
+    index = 0
+    while stack:
+        path_str, parent_index, depth, parts = stack.pop()
+        try:
+            with os.scandir(path_str) as entries:
+                subdir_names = sorted(
+                    entry.name for entry in entries
+                    if entry.name not in IGNORED_DIRS and entry.is_dir(follow_symlinks=False)
+                )
+        except OSError:
+            # Like os.walk, skip directories that cannot be listed
             continue
 
-        # Filter out ignored subdirectories
-        dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRS]
+        yield path_str, parent_index, depth, parts
+
+        for name in reversed(subdir_names):
+            stack.append((os.path.join(path_str, name), index, depth + 1, parts + (name.lower(),)))
+        index += 1
+
+
+def scan_directory_tree(
+    root: Path,
+) -> Tuple[
+    List[Path], List[List[Path]], Dict[Path, List[Path]], List[Path],
+    Dict[Path, Tuple[str, ...]],
+]:
+    """
+    Walk the tree once and build every index the analysis needs.
 
-        # Add this directory
+    Returns:
+        (directories, depth_buckets, {parent: [children]}, leaf_dirs,
+        {dir: lowercased parts relative to root}).
+        depth_buckets[d] lists the directories at depth d (root is 0).
+        Directories are in sorted (pre-order) order.
+    """
+    directories: List[Path] = []
+    depth_buckets: List[List[Path]] = []
+    children_map: Dict[Path, List[Path]] = {}
+    parts_lower: Dict[Path, Tuple[str, ...]] = {}
+
+    # Ignored subtrees are pruned during the walk, so only the root itself needs checking
+    if root.name in IGNORED_DIRS:
+        return directories, depth_buckets, children_map, [], parts_lower
+
+    # The walk itself stays on strings; each directory becomes a Path exactly once here
+    for path_str, parent_index, depth, parts in _walk_directories(os.fspath(root)):
+        if parent_index < 0:
+            dir_path = root
+        else:
+            dir_path = Path(path_str)
+            children_map.setdefault(directories[parent_index], []).append(dir_path)
         directories.append(dir_path)
+        parts_lower[dir_path] = parts
+        # Pre-order visits a parent before its children, so depth never skips ahead
+        if depth == len(depth_buckets):
+            depth_buckets.append([])
+        depth_buckets[depth].append(dir_path)
 
-    return sorted(directories)
+    leaf_dirs = [d for d in directories if d not in children_map]
+    return directories, depth_buckets, children_map, leaf_dirs, parts_lower
 
 
-def is_leaf_directory(dir_path: Path, all_dirs: List[Path]) -> bool:
-    """Check if a directory has no subdirectories."""
-    for other_dir in all_dirs:
-        if other_dir.parent == dir_path and other_dir != dir_path:
-            return False
-    return True
+def find_all_directories(root: Path) -> List[Path]:
+    """
+    Find all non-ignored directories recursively.
+
+    The walk already yields sorted pre-order, so no extra sort pass is made;
+    display code that needs a guaranteed order sorts by parts itself.
+    """
+    return scan_directory_tree(root)[0]
 
 
 def get_leaf_directories(directories: List[Path]) -> List[Path]:
     """Get all leaf directories (directories with no subdirectories)."""
-    return [d for d in directories if is_leaf_directory(d, directories)]
+    # 单次遍历收集所有父目录，不在其中的即为叶子目录
+    parents = set()
+    for d in directories:
+        parent = d.parent
+        if parent != d:  # Path('.').parent 仍是自身
+            parents.add(parent)
+    return [d for d in directories if d not in parents]
 
 
 def build_tree_string(directories: List[Path], root: Path) -> str:
     """Build a markdown-formatted tree string."""
-    # Build tree structure
-    tree = {}
+    # Split every path once and sort by parts, which is sorted pre-order
+    # (a no-op pass for Timsort when the input already comes from the walk).
+    all_parts = []
     for dir_path in directories:
-        relative = dir_path.relative_to(root)
-        current = tree
-        for part in relative.parts:
-            if part not in current:
-                current[part] = {}
-            current = current[part]
-
-    # Convert to markdown tree
-    lines = []
-
-    def add_to_tree(structure: Dict, prefix: str = "", is_top_level: bool = False):
-        items = list(structure.items())
-        for i, (name, children) in enumerate(items):
-            is_item_last = (i == len(items) - 1)
-
-            if is_top_level:
-                # Top-level items: no prefix
-                lines.append(name)
-            else:
-                # Nested items: use connector
-                connector = "└── " if is_item_last else "├── "
-                lines.append(f"{prefix}{connector}{name}")
+        relative = relative_posix(dir_path, root)
+        all_parts.append(relative.split('/') if relative else [])
+    all_parts.sort()
+
+    # Build tree structure. In pre-order, the prefix shared with the previous
+    # path is reused from node_stack and only the new trailing parts are
+    # looked up or created.
+    tree: Dict[str, Dict] = {}
+    prev_parts: List[str] = []
+    node_stack: List[Dict] = [tree]  # node_stack[i] is the node for prev_parts[:i]
+    for parts in all_parts:
+        common = 0
+        limit = min(len(parts), len(prev_parts))
+        while common < limit and parts[common] == prev_parts[common]:
+            common += 1
+        del node_stack[common + 1:]
+
+        current = node_stack[-1]
+        for part in parts[common:]:
+            child = current.get(part)
+            if child is None:
+                child = current[part] = {}
+            current = child
+            node_stack.append(current)
+        prev_parts = parts
+
+    # Convert to markdown tree (iterative depth-first walk; each stack frame
+    # holds the remaining siblings of one level, so no recursion is needed).
+    # Each line is written straight into one buffer instead of a list of lines.
+    buf = io.StringIO()
+    stack = [(iter(tree.items()), len(tree), 0, "", True)]
+
+    while stack:
+        items, count, index, prefix, is_top_level = stack[-1]
+        entry = next(items, None)
+        if entry is None:
+            stack.pop()
+            continue
+        name, children = entry
+        stack[-1] = (items, count, index + 1, prefix, is_top_level)
+        is_item_last = (index == count - 1)
 
-            # Update prefix for children
-            if children:
-                child_prefix = prefix + ("    " if is_item_last else "│   ")
-                add_to_tree(children, child_prefix, is_top_level=False)
+        if not is_top_level:
+            # Nested items: use connector (top-level items have no prefix)
+            buf.write(prefix)
+            buf.write("└── " if is_item_last else "├── ")
+        buf.write(name)
+        buf.write("\n")
 
-    add_to_tree(tree, is_top_level=True)
+        # Descend into children before the remaining siblings
+        if children:
+            child_prefix = prefix + ("    " if is_item_last else "│   ")
+            stack.append((iter(children.items()), len(children), 0, child_prefix, False))
 
-    return "\n".join(lines)
+    # Drop the final newline (lines are newline-separated, not terminated)
+    return buf.getvalue()[:-1]
 
 
 def get_code_files(dir_path: Path) -> List[Path]:
     """Get all code files in a directory."""
     code_files = []
-    if not dir_path.exists():
-        return code_files
 
-    for file_path in dir_path.iterdir():
-        if file_path.is_file() and file_path.suffix in CODE_EXTENSIONS:
-            code_files.append(file_path)
+    # DirEntry caches the file type from readdir, so no extra stat per entry.
+    # endswith() rejects most non-code names in one call. Every extension has a
+    # single leading dot, so the only splitext() rule left to check is that the
+    # last dot is preceded by some non-dot character (".py" has no extension).
+    try:
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.endswith(_CODE_EXT_TUPLE):
+                    continue
+                dot = name.rfind('.')
+                if name.count('.', 0, dot) < dot and entry.is_file():
+                    code_files.append(Path(entry.path))
+    except FileNotFoundError:
+        return code_files
 
-    return sorted(code_files)
+    code_files.sort(key=lambda p: p.name)
+    return code_files
 
 
 def print_analysis(root: Path | None = None):
@@ -168,10 +303,23 @@ def print_analysis(root: Path | None = None):
 # Incremental Modules Generation Functions
 # ============================================================================
 
+# 描述字符串池：整棵树通常只有几十种不同描述，共享同一对象以节省内存
+_DESC_POOL: Dict[str, str] = {}
+
+
+def intern_description(desc: str) -> str:
+    """返回池中与 desc 相等的共享字符串对象。"""
+    return _DESC_POOL.setdefault(desc, desc)
+
+
+@functools.lru_cache(maxsize=None)
 def get_full_path(dir_path: Path, root: Path) -> str:
     """
     获取相对于根目录的完整路径字符串。
 
+    结果只取决于两个路径本身，按 (dir_path, root) 缓存；骨架生成、描述写回和
+    各增量流程会对同一目录反复求值。条目数与目录数同阶，因此不设上限。
+
     Args:
         dir_path: 目录路径
         root: 项目根目录
@@ -179,117 +327,182 @@ def get_full_path(dir_path: Path, root: Path) -> str:
     Returns:
         完整路径字符串（如：myproject/src/api/auth/）
     """
-    relative = dir_path.relative_to(root)
-    if relative == Path('.'):
+    # relative_posix 统一使用正斜杠，跨平台兼容
+    relative = relative_posix(dir_path, root)
+    if not relative:
         return f"{root.name}/"
-    # 使用 as_posix() 确保使用正斜杠，跨平台兼容
-    return f"{root.name}/{relative.as_posix()}/"
+    return f"{root.name}/{relative}/"
 
 
-def update_progress_header(root: Path, processing_dir: str):
+def _description_path(line: str, root: Path) -> str | None:
     """
-    更新 modules.md 中的进度头信息。
+    取出「完整路径 - 描述」行中的完整路径，不是描述行时返回 None。
 
-    Args:
-        root: 项目根目录
-        processing_dir: 当前正在处理的目录
+    完整路径总以 "/" 结尾，但目录名本身可能含 " - "，因此每个 "/ - " 之前的前缀都是候选；
+    只有一个候选时直接采用，有多个时取其中磁盘上确实存在的最长目录。
     """
-    from datetime import datetime
-
-    modules_md_path = root / "modules.md"
-    if not modules_md_path.exists():
-        return
-
-    # 读取文件
-    content = modules_md_path.read_text(encoding='utf-8')
-    lines = content.split('\n')
-
-    # 生成新的进度头
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    new_header = f"<!-- Last Update: {timestamp} | Processing: {processing_dir} -->"
-
-    # 查找并替换进度头
-    updated_lines = []
-    for line in lines:
-        if line.strip().startswith("<!-- Last Update:"):
-            updated_lines.append(new_header)
-        else:
-            updated_lines.append(line)
-
-    # 如果没有找到进度头，在文件末尾添加
-    if not any("<!-- Last Update:" in line for line in updated_lines):
-        updated_lines.append("")
-        updated_lines.append(new_header)
-
-    modules_md_path.write_text('\n'.join(updated_lines), encoding='utf-8')
-
-
-def remove_progress_header(root: Path):
+    idx = line.find("/ - ")
+    if idx == -1:
+        return None
+    candidates = []
+    while idx != -1:
+        candidates.append(line[:idx + 1])
+        idx = line.find("/ - ", idx + 1)
+    if len(candidates) > 1:
+        prefix_len = len(root.name) + 1
+        for candidate in reversed(candidates[1:]):
+            if os.path.isdir(os.path.join(root, candidate[prefix_len:])):
+                return candidate
+    return candidates[0]
+
+
+def build_full_path_map(directories: List[Path], root: Path) -> Dict[Path, str]:
     """
-    移除 modules.md 中的进度头信息。
+    一次性计算每个目录在 modules.md 中使用的完整路径键。
 
     Args:
+        directories: 目录路径列表
         root: 项目根目录
-    """
-    modules_md_path = root / "modules.md"
-    if not modules_md_path.exists():
-        return
-
-    # 读取文件
-    content = modules_md_path.read_text(encoding='utf-8')
-    lines = content.split('\n')
-
-    # 移除进度头行
-    updated_lines = [line for line in lines if not line.strip().startswith("<!-- Last Update:")]
-
-    # 移除末尾多余的空行
-    while updated_lines and updated_lines[-1].strip() == "":
-        updated_lines.pop()
 
-    modules_md_path.write_text('\n'.join(updated_lines), encoding='utf-8')
+    Returns:
+        字典 {目录路径: 完整路径字符串}
+    """
+    return {dir_path: get_full_path(dir_path, root) for dir_path in directories}
 
 
-def batch_update_descriptions(root: Path, updates: List[Tuple[Path, str]]):
+def _write_text_atomic(path: Path, text: str):
     """
-    批量更新 modules.md 中的多个描述。
+    先写入同目录下的临时文件再原子替换，避免中断时留下写了一半的文件。
+
+    临时文件名由 tempfile 生成，多个线程同时写同一目标时互不干扰。
 
     Args:
-        root: 项目根目录
-        updates: [(目录路径, 新描述), ...] 列表
+        path: 目标文件路径
+        text: 要写入的完整内容
     """
-    modules_md_path = root / "modules.md"
-    if not modules_md_path.exists():
-        raise FileNotFoundError("modules.md not found")
+    with tempfile.NamedTemporaryFile(
+        'w', encoding='utf-8', dir=path.parent,
+        prefix=f".{path.name}.", suffix='.tmp', delete=False,
+    ) as tmp:
+        tmp.write(text)
+    try:
+        # NamedTemporaryFile 以 0600 创建，替换已有文件时沿用原文件的权限
+        try:
+            os.chmod(tmp.name, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(tmp.name, path)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
 
-    # 读取文件
-    content = modules_md_path.read_text(encoding='utf-8')
-    lines = content.split('\n')
 
-    # 构建查找字典：完整路径 -> 新描述
-    update_map = {}
-    for dir_path, new_desc in updates:
-        full_path = get_full_path(dir_path, root)
-        update_map[full_path] = new_desc
-
-    # 更新匹配的行
-    updated_lines = []
-    for line in lines:
-        updated = False
-        for full_path, new_desc in update_map.items():
-            # 匹配格式：完整路径 - 描述
-            if line.startswith(full_path + " - "):
-                updated_lines.append(f"{full_path} - {new_desc}")
-                updated = True
-                break
+class ModulesMdStore:
+    """
+    modules.md 的内存视图：构造时读取一次，更新只修改内存，flush() 时一次性写回。
 
-        if not updated:
-            updated_lines.append(line)
+    供需要多批次更新描述的流程（验证修复、增量更新）使用，
+    避免每个批次都完整读写一次文件；进度头同样只在内存中更新，与描述一起写回。
+    """
 
-    # 写回文件
-    modules_md_path.write_text('\n'.join(updated_lines), encoding='utf-8')
+    def __init__(self, root: Path, full_path_map: Dict[Path, str] | None = None):
+        self.root = root
+        # 目录 -> 完整路径键的缓存，可由调用方用已计算好的映射预先填充
+        self.full_path_map: Dict[Path, str] = full_path_map if full_path_map is not None else {}
+        self.path = root / "modules.md"
+        if not self.path.exists():
+            raise FileNotFoundError("modules.md not found")
+
+        self.lines: List[str] = self.path.read_text(encoding='utf-8').split('\n')
+        # 完整路径 -> 行号列表（格式为「完整路径 - 描述」）
+        self.line_index: Dict[str, List[int]] = {}
+        # 进度头所在行号（只记录以标记开头的行）；任意位置含标记即视为已有进度头，不再追加
+        self.progress_lines: List[int] = []
+        self.has_progress = False
+        # 行索引和进度头在同一趟遍历中建立
+        for i, line in enumerate(self.lines):
+            full_path = _description_path(line, root)
+            if full_path is not None:
+                self.line_index.setdefault(full_path, []).append(i)
+            if "<!-- Last Update:" in line:
+                self.has_progress = True
+                if line.strip().startswith("<!-- Last Update:"):
+                    self.progress_lines.append(i)
+        self.dirty: Set[str] = set()
+        self.progress_dirty = False
+        self.drop_progress = False
+
+    def descriptions(self) -> Dict[str, str]:
+        """
+        按内存中的当前内容解析目录描述（与 parse_existing_descriptions 的结果相同）。
+
+        Returns:
+            完整路径 -> 描述 的字典
+        """
+        return _parse_description_lines(self.lines)
+
+    def update_many(self, updates: List[Tuple[Path, str]]):
+        """
+        在内存中更新多个描述。
+
+        Args:
+            updates: [(目录路径, 新描述), ...] 列表
+        """
+        for dir_path, new_desc in updates:
+            full_path = self.full_path_map.get(dir_path)
+            if full_path is None:
+                full_path = self.full_path_map[dir_path] = get_full_path(dir_path, self.root)
+            new_line = f"{full_path} - {new_desc}"
+            # 只有内容确实变化时才记为待写回，描述未变的批次不会触发写文件
+            for i in self.line_index.get(full_path, ()):
+                if self.lines[i] != new_line:
+                    self.lines[i] = new_line
+                    self.dirty.add(full_path)
+
+    def set_progress(self, processing_dir: str):
+        """
+        在内存中更新进度头，文件中没有进度头时追加到末尾。
+
+        Args:
+            processing_dir: 当前正在处理的目录
+        """
+        timestamp = datetime.now().isoformat(sep=' ', timespec='seconds')
+        new_header = f"<!-- Last Update: {timestamp} | Processing: {processing_dir} -->"
+        for i in self.progress_lines:
+            if self.lines[i] != new_header:
+                self.lines[i] = new_header
+                self.progress_dirty = True
+        if not self.has_progress:
+            # 没有进度头时在文件末尾添加
+            self.lines.append("")
+            self.lines.append(new_header)
+            self.progress_lines.append(len(self.lines) - 1)
+            self.has_progress = True
+            self.progress_dirty = True
+        self.drop_progress = False
+
+    def remove_progress(self):
+        """写回时移除进度头及末尾多余的空行。"""
+        self.drop_progress = True
+        # 既没有进度头、末尾也没有空行时，移除后内容不变，无需写回
+        if self.progress_lines or (self.lines and self.lines[-1].strip() == ""):
+            self.progress_dirty = True
+
+    def flush(self):
+        """将内存中的修改写回 modules.md（无修改时不写文件）。"""
+        if not self.dirty and not self.progress_dirty:
+            return
+        lines = self.lines
+        if self.drop_progress:
+            lines = [line for line in lines if not line.strip().startswith("<!-- Last Update:")]
+            while lines and lines[-1].strip() == "":
+                lines.pop()
+        _write_text_atomic(self.path, '\n'.join(lines))
+        self.dirty.clear()
+        self.progress_dirty = False
 
 
-def get_directories_by_depth(directories: List[Path], root: Path) -> Dict[int, List[Path]]:
+def get_directories_by_depth(directories: List[Path], root: Path) -> List[List[Path]]:
     """
     按层级分组目录。
 
@@ -298,34 +511,34 @@ def get_directories_by_depth(directories: List[Path], root: Path) -> Dict[int, L
         root: 项目根目录
 
     Returns:
-        字典 {深度: [目录列表]}
+        按深度索引的列表：第 d 项为深度 d 的目录列表（根目录深度为 0，缺失的层级为空列表）
     """
-    depth_map: Dict[int, List[Path]] = {}
+    depth_buckets: List[List[Path]] = []
 
     for dir_path in directories:
-        relative = dir_path.relative_to(root)
-        depth = len(relative.parts) if relative != Path('.') else 0
-        if depth not in depth_map:
-            depth_map[depth] = []
-        depth_map[depth].append(dir_path)
+        relative = relative_posix(dir_path, root)
+        depth = relative.count('/') + 1 if relative else 0
+        while len(depth_buckets) <= depth:
+            depth_buckets.append([])
+        depth_buckets[depth].append(dir_path)
 
-    return depth_map
+    return depth_buckets
 
 
-def generate_initial_skeleton(root: Path) -> str:
+def generate_initial_skeleton(root: Path, directories: List[Path] | None = None) -> str:
     """
     生成初始 modules.md 骨架（包含树结构和占位描述）。
 
     Args:
         root: 项目根目录
+        directories: 已扫描的目录列表（为空时重新扫描）
 
     Returns:
         完整的 markdown 内容
     """
-    from datetime import datetime
-
     # 查找所有目录
-    directories = find_all_directories(root)
+    if directories is None:
+        directories = find_all_directories(root)
 
     # 1. 标题
     lines = ["# Modules", ""]
@@ -338,415 +551,425 @@ def generate_initial_skeleton(root: Path) -> str:
     lines.append("")
 
     # 3. 模块描述（完整路径 + 占位符）
+    # 按路径片段排序：元组比较比 Path.__lt__ 便宜，扫描结果本已有序时只是一次线性检查
     lines.append("## Module Descriptions")
     lines.append("")
-    for dir_path in sorted(directories):
+    for dir_path in sorted(directories, key=lambda p: p.parts):
         full_path = get_full_path(dir_path, root)
         lines.append(f"{full_path} - [待分析]")
     lines.append("")
 
     # 4. 进度头（在最后，方便移除）
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    timestamp = datetime.now().isoformat(sep=' ', timespec='seconds')
     lines.append(f"<!-- Last Update: {timestamp} | Processing: Initializing -->")
 
     return '\n'.join(lines)
 
 
-def create_skeleton_file(root: Path):
+def create_skeleton_file(root: Path, directories: List[Path] | None = None):
     """
     创建初始 modules.md 文件。
 
     Args:
         root: 项目根目录
+        directories: 已扫描的目录列表（为空时重新扫描）
     """
-    skeleton = generate_initial_skeleton(root)
+    if directories is None:
+        directories = find_all_directories(root)
+    skeleton = generate_initial_skeleton(root, directories)
     modules_md_path = root / "modules.md"
     modules_md_path.write_text(skeleton, encoding='utf-8')
     print(f"Created: {modules_md_path}")
-    print(f"  Found {len(find_all_directories(root))} directories")
-
-
-def analyze_by_path(dir_path: Path, root: Path) -> str:
+    print(f"  Found {len(directories)} directories")
+
+
+# =============== analyze_by_path 规则表（模块加载时构建一次） ===============
+
+def _build_name_map(rules) -> Dict[str, str]:
+    """将 ((名称, ...), 描述) 规则展开为 名称 -> 描述，先出现的规则优先。"""
+    name_map: Dict[str, str] = {}
+    for names, desc in rules:
+        for name in names:
+            name_map.setdefault(name, desc)
+    return name_map
+
+
+# 第一层：顶级目录名 -> 描述
+TOP_LEVEL_MAP = _build_name_map((
+    (('api', 'apis'), 'API接口定义层'),
+    (('service', 'services'), '业务服务层'),
+    (('platform', 'core'), '平台核心模块'),
+    (('config', 'conf', 'settings'), '系统配置管理'),
+    (('test', 'tests'), '测试用例'),
+    (('doc', 'docs'), '文档目录'),
+    (('run', 'dist', 'build', 'bin'), '运行时目录'),
+    (('tmp', 'temp', 'cache'), '临时文件目录'),
+    (('vendor', 'third_party'), '第三方依赖'),
+    (('scripts', 'script'), '脚本与工具'),
+    (('modules', 'mod'), '功能模块集'),
+    (('assets',), '静态资源目录'),
+    (('references', 'ref', 'refs'), '参考资源目录'),
+    (('lib', 'libs'), '依赖库目录'),
+    (('include', 'includes'), '头文件目录'),
+    (('src', 'source'), '源代码目录'),
+))
+TOP_LEVEL_SUBSTRINGS = ('common', 'shared', 'util')
+
+# 路径中包含 API / 服务层片段时，按子片段细分
+API_PARTS = frozenset({'api', 'apis', 'rpc'})
+API_SUB_RULES = (('plat', '平台API接口'), ('agent', 'Agent API接口'))
+SERVICE_SUB_RULES = (
+    ('manage', '管理服务'),
+    ('dashboard', '仪表盘服务'),
+    ('agent', 'Agent服务'),
+    ('public', '公共服务'),
+)
+
+# 业务模块：路径片段 -> 描述（按优先级排列）
+PATH_PART_RULES = (
+    ('hr', '人力资源管理模块'),
+    ('enterprise', '企业管理模块'),
+    ('pay', '支付服务模块'),
+    ('mail', '邮件服务模块'),
+    ('sms', '短信服务模块'),
+    ('video', '视频处理模块'),
+    ('file', '文件管理模块'),
+    ('user', '用户管理模块'),
+    ('auth', '认证授权模块'),
+    ('ai', 'AI服务模块'),
+    ('search', '搜索服务模块'),
+    ('recruitment', '招聘管理模块'),
+    ('resume', '简历管理模块'),
+    ('course', '课程管理模块'),
+    ('tex', '考试测评模块'),
+    ('workorder', '工单管理模块'),
+    ('notice', '消息通知模块'),
+    ('invoice', '发票管理模块'),
+    ('contract', '合同管理模块'),
+    ('order', '订单管理模块'),
+    ('product', '产品管理模块'),
+    ('resource', '资源管理模块'),
+    ('cluster', '集群管理模块'),
+    ('container', '容器管理模块'),
+    ('gpu', 'GPU资源模块'),
+    ('hardware', '硬件管理模块'),
+    ('network', '网络管理模块'),
+    ('log', '日志管理模块'),
+    ('logger', '日志管理模块'),
+    ('cache', '缓存服务模块'),
+    ('redis', '缓存服务模块'),
+    ('db', '数据库模块'),
+    ('database', '数据库模块'),
+    ('mq', '消息队列模块'),
+    ('queue', '消息队列模块'),
+    ('event', '事件处理模块'),
+    ('driver', '驱动适配层'),
+    ('adapter', '适配器层'),
+    ('middleware', '中间件层'),
+    ('controller', '控制器层'),
+    ('handler', '控制器层'),
+    ('model', '数据模型层'),
+    ('entity', '数据模型层'),
+    ('common', '通用工具模块'),
+    ('util', '通用工具模块'),
+    ('security', '安全防护模块'),
+    ('test', '测试模块'),
+)
+PATH_PART_MAP = dict(PATH_PART_RULES)
+PATH_PART_PRIORITY = {part: i for i, (part, _) in enumerate(PATH_PART_RULES)}
+PATH_PART_KEYS = frozenset(PATH_PART_MAP)
+
+# 目录名包含关键词 -> 描述（按优先级排列）
+DIR_NAME_SUBSTR_RULES = (
+    (('api',), 'API接口'),
+    (('service',), '业务服务'),
+    (('controller', 'handler'), '控制器'),
+    (('model',), '数据模型'),
+    (('adapter',), '适配器'),
+    (('driver',), '驱动器'),
+    (('middleware',), '中间件'),
+    (('auth',), '认证授权'),
+    (('config',), '配置管理'),
+    (('util', 'common'), '工具函数'),
+)
+
+# 目录名前缀 / 后缀 -> 描述
+DIR_NAME_AFFIX_RULES = (
+    (('api_',), ('_api',), 'API接口'),
+    (('service_',), ('_service',), '业务服务'),
+    (('controller',), ('_controller',), '控制器'),
+    (('model',), ('_model',), '数据模型'),
+    (('handler',), ('_handler',), '请求处理器'),
+    (('adapter',), ('_adapter',), '适配器'),
+    (('driver',), ('_driver',), '驱动器'),
+)
+
+# 常见目录名 -> 描述
+DIR_NAME_MAP = _build_name_map((
+    (('conf', 'config', 'configs'), '配置文件目录'),
+    (('certs', 'certificates'), '证书文件目录'),
+    (('example', 'examples', 'demo'), '示例代码'),
+    (('test', 'tests', 'spec'), '测试用例'),
+    (('doc', 'docs', 'readme'), '文档目录'),
+    (('log', 'logs'), '日志目录'),
+))
+
+
+def _dir_name(dir_path: Path) -> str:
+    """目录名；"." 或 ".." 这类相对路径本身没有名字，回退到解析后的真实目录名。"""
+    name = dir_path.name
+    if not name or name == '..':
+        return dir_path.resolve().name
+    return name
+
+
+def analyze_by_path(
+    dir_path: Path, root: Path, parts_lower: Tuple[str, ...] | None = None
+) -> str:
     """
     基于完整路径的启发式规则推断目录功能。
 
     Args:
-        dir_path: 目录路径
+        dir_path: 目录路径（与 root 同为绝对路径或同为相对路径）
         root: 项目根目录
+        parts_lower: 预先小写的相对路径片段（来自 scan_directory_tree），
+            提供时不再重新计算相对路径和小写
 
     Returns:
-        功能描述字符串，如果无法推断则返回 None
+        功能描述字符串，如果无法推断则返回 "NEED_CODE_ANALYSIS"
     """
-    # 确保路径是绝对路径
-    dir_path = dir_path.resolve()
-    root = root.resolve()
+    if parts_lower is not None:
+        dir_name = parts_lower[-1] if parts_lower else _dir_name(dir_path).lower()
+        return _analyze_by_path_cached(parts_lower, dir_name)
 
     # 获取相对路径（如 platform/service/manage/hr/）
     try:
         relative = dir_path.relative_to(root)
     except ValueError:
         # dir_path 不是 root 的子路径，使用目录名
-        path_parts = [dir_path.name]
+        path_parts = [_dir_name(dir_path)]
     else:
         path_parts = list(relative.parts)
 
-    path_str = '/'.join(path_parts).lower()
+    parts = tuple(p.lower() for p in path_parts)
+    return _analyze_by_path_cached(parts, _dir_name(dir_path).lower())
+
 
-    dir_name = dir_path.name.lower()
+@functools.lru_cache(maxsize=4096)
+def _analyze_by_path_cached(parts: Tuple[str, ...], dir_name: str) -> str:
+    """analyze_by_path 的纯函数核心，按 (小写路径片段, 小写目录名) 缓存结果。"""
+    parts_set = set(parts)
 
     # =============== 第一层：顶级目录 ===============
-    if len(path_parts) == 1:
-        if dir_name in ['api', 'apis']:
-            return 'API接口定义层'
-        elif dir_name in ['service', 'services']:
-            return '业务服务层'
-        elif dir_name in ['platform', 'core']:
-            return '平台核心模块'
-        elif any(k in dir_name for k in ['common', 'shared', 'util']):
+    if len(parts) == 1:
+        desc = TOP_LEVEL_MAP.get(dir_name)
+        if desc is not None:
+            return desc
+        if any(k in dir_name for k in TOP_LEVEL_SUBSTRINGS):
             return '公共工具与组件'
-        elif dir_name in ['config', 'conf', 'settings']:
-            return '系统配置管理'
-        elif dir_name in ['test', 'tests']:
-            return '测试用例'
-        elif dir_name in ['doc', 'docs', 'docs']:
-            return '文档目录'
-        elif dir_name in ['run', 'dist', 'build', 'bin']:
-            return '运行时目录'
-        elif dir_name in ['tmp', 'temp', 'cache']:
-            return '临时文件目录'
-        elif dir_name in ['vendor', 'third_party']:
-            return '第三方依赖'
-        elif dir_name in ['scripts', 'script']:
-            return '脚本与工具'
-        elif dir_name in ['modules', 'mod']:
-            return '功能模块集'
-        elif dir_name in ['assets']:
-            return '静态资源目录'
-        elif dir_name in ['references', 'ref', 'refs']:
-            return '参考资源目录'
-        elif dir_name in ['lib', 'libs']:
-            return '依赖库目录'
-        elif dir_name in ['include', 'includes']:
-            return '头文件目录'
-        elif dir_name in ['src', 'source']:
-            return '源代码目录'
 
     # =============== 第二层及更深层：路径模式匹配 ===============
 
     # API 相关
-    if any(p in path_parts for p in ['api', 'apis', 'rpc']):
-        if 'plat' in path_parts:
-            return '平台API接口'
-        elif 'agent' in path_parts:
-            return 'Agent API接口'
-        else:
-            return 'RESTful API接口'
+    if not parts_set.isdisjoint(API_PARTS):
+        for part, desc in API_SUB_RULES:
+            if part in parts_set:
+                return desc
+        return 'RESTful API接口'
 
     # 服务层
-    if 'service' in path_parts:
-        if 'manage' in path_parts:
-            return '管理服务'
-        elif 'dashboard' in path_parts:
-            return '仪表盘服务'
-        elif 'agent' in path_parts:
-            return 'Agent服务'
-        elif 'public' in path_parts:
-            return '公共服务'
-        else:
-            return '业务服务'
-
-    # 业务模块
-    if 'hr' in path_parts:
-        return '人力资源管理模块'
-    elif 'enterprise' in path_parts:
-        return '企业管理模块'
-    elif 'pay' in path_parts:
-        return '支付服务模块'
-    elif 'mail' in path_parts:
-        return '邮件服务模块'
-    elif 'sms' in path_parts:
-            return '短信服务模块'
-    elif 'video' in path_parts:
-        return '视频处理模块'
-    elif 'file' in path_parts:
-        return '文件管理模块'
-    elif 'user' in path_parts:
-        return '用户管理模块'
-    elif 'auth' in path_parts:
-        return '认证授权模块'
-    elif 'ai' in path_parts:
-        return 'AI服务模块'
-    elif 'search' in path_parts:
-        return '搜索服务模块'
-    elif 'recruitment' in path_parts:
-        return '招聘管理模块'
-    elif 'resume' in path_parts:
-        return '简历管理模块'
-    elif 'course' in path_parts:
-        return '课程管理模块'
-    elif 'tex' in path_parts:
-        return '考试测评模块'
-    elif 'workorder' in path_parts:
-        return '工单管理模块'
-    elif 'notice' in path_parts:
-        return '消息通知模块'
-    elif 'invoice' in path_parts:
-        return '发票管理模块'
-    elif 'contract' in path_parts:
-        return '合同管理模块'
-    elif 'order' in path_parts:
-        return '订单管理模块'
-    elif 'product' in path_parts:
-        return '产品管理模块'
-    elif 'resource' in path_parts:
-        return '资源管理模块'
-    elif 'cluster' in path_parts:
-        return '集群管理模块'
-    elif 'container' in path_parts:
-        return '容器管理模块'
-    elif 'gpu' in path_parts:
-        return 'GPU资源模块'
-    elif 'hardware' in path_parts:
-        return '硬件管理模块'
-    elif 'network' in path_parts:
-        return '网络管理模块'
-    elif 'log' in path_parts or 'logger' in path_parts:
-        return '日志管理模块'
-    elif 'cache' in path_parts or 'redis' in path_parts:
-        return '缓存服务模块'
-    elif 'db' in path_parts or 'database' in path_parts:
-        return '数据库模块'
-    elif 'mq' in path_parts or 'queue' in path_parts:
-        return '消息队列模块'
-    elif 'event' in path_parts:
-        return '事件处理模块'
-    elif 'driver' in path_parts:
-        return '驱动适配层'
-    elif 'adapter' in path_parts:
-        return '适配器层'
-    elif 'middleware' in path_parts:
-        return '中间件层'
-    elif 'controller' in path_parts or 'handler' in path_parts:
-        return '控制器层'
-    elif 'model' in path_parts or 'entity' in path_parts:
-        return '数据模型层'
-    elif 'common' in path_parts or 'util' in path_parts:
-        return '通用工具模块'
-    elif 'security' in path_parts:
-        return '安全防护模块'
-    elif 'test' in path_parts:
-        return '测试模块'
+    if 'service' in parts_set:
+        for part, desc in SERVICE_SUB_RULES:
+            if part in parts_set:
+                return desc
+        return '业务服务'
+
+    # 业务模块：一次集合求交，按优先级取命中项
+    hits = parts_set & PATH_PART_KEYS
+    if hits:
+        return PATH_PART_MAP[min(hits, key=PATH_PART_PRIORITY.__getitem__)]
 
     # =============== 目录名本身的关键词匹配 ===============
-    if any(k in dir_name for k in ['api', 'service', 'controller', 'model', 'handler', 'adapter', 'driver', 'middleware', 'auth', 'config', 'util', 'common']):
-        if 'api' in dir_name:
-            return 'API接口'
-        elif 'service' in dir_name:
-            return '业务服务'
-        elif 'controller' in dir_name or 'handler' in dir_name:
-            return '控制器'
-        elif 'model' in dir_name:
-            return '数据模型'
-        elif 'adapter' in dir_name:
-            return '适配器'
-        elif 'driver' in dir_name:
-            return '驱动器'
-        elif 'middleware' in dir_name:
-            return '中间件'
-        elif 'auth' in dir_name:
-            return '认证授权'
-        elif 'config' in dir_name:
-            return '配置管理'
-        elif 'util' in dir_name or 'common' in dir_name:
-            return '工具函数'
+    for keys, desc in DIR_NAME_SUBSTR_RULES:
+        if any(k in dir_name for k in keys):
+            return desc
 
     # =============== 第三层：子目录名称模式 ===============
-    if dir_name.startswith('api_') or dir_name.endswith('_api'):
-        return 'API接口'
-    elif dir_name.startswith('service_') or dir_name.endswith('_service'):
-        return '业务服务'
-    elif dir_name.startswith('controller') or dir_name.endswith('_controller'):
-        return '控制器'
-    elif dir_name.startswith('model') or dir_name.endswith('_model'):
-        return '数据模型'
-    elif dir_name.startswith('handler') or dir_name.endswith('_handler'):
-        return '请求处理器'
-    elif dir_name.startswith('adapter') or dir_name.endswith('_adapter'):
-        return '适配器'
-    elif dir_name.startswith('driver') or dir_name.endswith('_driver'):
-        return '驱动器'
+    for prefixes, suffixes, desc in DIR_NAME_AFFIX_RULES:
+        if dir_name.startswith(prefixes) or dir_name.endswith(suffixes):
+            return desc
 
     # =============== 常见目录名 ===============
-    if dir_name in ['conf', 'config', 'configs']:
-        return '配置文件目录'
-    elif dir_name in ['certs', 'certificates']:
-        return '证书文件目录'
-    elif dir_name in ['example', 'examples', 'demo']:
-        return '示例代码'
-    elif dir_name in ['test', 'tests', 'spec']:
-        return '测试用例'
-    elif dir_name in ['doc', 'docs', 'readme']:
-        return '文档目录'
-    elif dir_name in ['log', 'logs']:
-        return '日志目录'
-
-    # 无法推断，返回特殊标记提示需要代码分析
-    return "NEED_CODE_ANALYSIS"
-
-
-def analyze_directory_code(dir_path: Path) -> str:
+    # 无法推断时返回特殊标记提示需要代码分析
+    return DIR_NAME_MAP.get(dir_name, "NEED_CODE_ANALYSIS")
+
+
+def analyze_directory_code(
+    dir_path: Path,
+    root: Path | None = None,
+    parts_lower: Tuple[str, ...] | None = None,
+) -> str:
     """
     分析目录中的代码并生成功能描述（中文）。
 
     Args:
         dir_path: 目录路径
+        root: 项目根目录（默认为当前目录）
+        parts_lower: 预先小写的相对路径片段，透传给 analyze_by_path
 
     Returns:
         功能描述（10~50 个中文字符）
     """
-    # 先基于路径推断
-    import os
-    root = Path.cwd()
-    desc = analyze_by_path(dir_path, root)
-
-    # 如果返回特殊标记，说明需要代码分析
-    if desc == "NEED_CODE_ANALYSIS":
-        # 需要读取代码文件进行深入分析
-        code_files = get_code_files(dir_path)
-
-        if not code_files:
-            return "配置文件或资源目录"
-
-        # 读取代码文件
-        all_content = ""
-        file_names = [f.name for f in code_files]
-        for code_file in code_files[:5]:  # 最多读取 5 个文件
-            try:
-                content = code_file.read_text(encoding='utf-8', errors='ignore')
-                all_content += content + "\n"
-            except Exception:
-                continue
+    if root is None:
+        root = Path.cwd()
+        if not dir_path.is_absolute():
+            # 相对路径本就相对于当前目录，直接拼接即可，无需 resolve()
+            dir_path = root / dir_path
 
-        if not all_content:
-            return "无有效代码文件"
-
-        content_lower = all_content.lower()
-        dir_name = dir_path.name.lower()
-
-        # 简化的关键词映射
-        keywords_map = {
-            'auth': '认证授权模块',
-            'config': '配置管理',
-            'util': '工具函数',
-            'api': 'API接口',
-            'model': '数据模型',
-            'service': '业务服务',
-            'test': '测试用例',
-            'controller': '控制器',
-            'middleware': '中间件',
-            'client': '客户端',
-            'server': '服务器',
-            'cache': '缓存',
-            'log': '日志',
-            'security': '安全模块',
-            'event': '事件处理',
-            'task': '任务调度',
-            'socket': '通信模块',
-            'storage': '存储模块',
-            'driver': '驱动器',
-            'adapter': '适配器',
-        }
-
-        # 1. 基于目录名匹配
-        for key, desc_str in keywords_map.items():
-            if key in dir_name:
-                return desc_str
+    # 先基于路径推断，命中时无需读取任何文件
+    desc = analyze_by_path(dir_path, root, parts_lower)
+    if desc != "NEED_CODE_ANALYSIS":
+        return desc
+
+    # 需要读取代码文件进行深入分析
+    code_files = get_code_files(dir_path)
+
+    if not code_files:
+        return "配置文件或资源目录"
 
-        # 2. 基于文件名匹配
-        for file_name in file_names:
-            file_lower = file_name.lower()
-            for key, desc_str in keywords_map.items():
-                if key in file_lower:
-                    return desc_str
+    return _analyze_code_files(dir_path, code_files)
+
+
+# 内容分析的关键词 -> 描述（先出现的规则优先；依次匹配目录名、文件名、文件内容）
+CODE_KEYWORD_RULES = (
+    ('auth', '认证授权模块'),
+    ('config', '配置管理'),
+    ('util', '工具函数'),
+    ('api', 'API接口'),
+    ('model', '数据模型'),
+    ('service', '业务服务'),
+    ('test', '测试用例'),
+    ('controller', '控制器'),
+    ('middleware', '中间件'),
+    ('client', '客户端'),
+    ('server', '服务器'),
+    ('cache', '缓存'),
+    ('log', '日志'),
+    ('security', '安全模块'),
+    ('event', '事件处理'),
+    ('task', '任务调度'),
+    ('socket', '通信模块'),
+    ('storage', '存储模块'),
+    ('driver', '驱动器'),
+    ('adapter', '适配器'),
+)
+
+# 内容匹配用的字节版规则：关键词均为 ASCII，文件开头直接按字节小写后比较，无需解码
+_CODE_CONTENT_RULES = tuple((key.encode('ascii'), desc_str) for key, desc_str in CODE_KEYWORD_RULES)
+
+
+def _match_keyword_names(dir_name: str, file_names: List[str]) -> str | None:
+    """按目录名、再按各文件名匹配 CODE_KEYWORD_RULES，未命中时返回 None。"""
+    # 1. 基于目录名匹配
+    for key, desc_str in CODE_KEYWORD_RULES:
+        if key in dir_name:
+            return desc_str
 
-        # 3. 基于代码内容匹配
-        for key, desc_str in keywords_map.items():
-            if key in content_lower:
+    # 2. 基于文件名匹配
+    for file_name in file_names:
+        file_lower = file_name.lower()
+        for key, desc_str in CODE_KEYWORD_RULES:
+            if key in file_lower:
                 return desc_str
 
-        # 4. 默认：使用目录名生成描述
-        dir_display = dir_path.name
-        if len(dir_display) > 10:
-            dir_display = dir_display[:10]
-        return f'{dir_display}相关模块'
+    return None
 
-    # 返回路径推断结果
-    return desc
 
-    if not code_files:
-        return "配置文件或资源目录"
+def _analyze_code_files(dir_path: Path, code_files: List[Path]) -> str:
+    """
+    基于目录名、代码文件名和文件开头内容的关键词匹配生成描述。
+
+    Args:
+        dir_path: 目录路径
+        code_files: 目录中的代码文件（非空，按文件名排序）
 
-    # 读取代码文件
-    all_content = ""
-    file_names = [f.name for f in code_files]
+    Returns:
+        功能描述
+    """
+    # 目录名/文件名命中时无需比较内容，只要确认至少有一个代码文件可读即可
+    name_desc = _match_keyword_names(dir_path.name.lower(), [f.name for f in code_files])
+
+    # 读取代码文件（每个文件只读开头一段，逐个保存按字节小写的内容）
+    contents_lower: List[bytes] = []
     for code_file in code_files[:5]:  # 最多读取 5 个文件
         try:
-            content = code_file.read_text(encoding='utf-8', errors='ignore')
-            all_content += content + "\n"
+            with open(code_file, 'rb') as f:
+                head = f.read(CODE_SAMPLE_BYTES)
         except Exception:
             continue
+        if name_desc is not None:
+            return name_desc
+        contents_lower.append(head.lower())
 
-    if not all_content:
+    if not contents_lower:
         return "无有效代码文件"
 
-    content_lower = all_content.lower()
-    dir_name = dir_path.name.lower()
-
-    # Fallback：基于目录名和内容的简单匹配
-    # 仅当路径无法推断时才使用
-
-    # 简化的关键词映射
-    keywords_map = {
-        'auth': '认证授权模块',
-        'config': '配置管理',
-        'util': '工具函数',
-        'api': 'API接口',
-        'model': '数据模型',
-        'service': '业务服务',
-        'test': '测试用例',
-        'controller': '控制器',
-        'middleware': '中间件',
-        'client': '客户端',
-        'server': '服务器',
-        'cache': '缓存',
-        'log': '日志',
-        'security': '安全模块',
-        'event': '事件处理',
-        'task': '任务调度',
-        'socket': '通信模块',
-        'storage': '存储模块',
-        'driver': '驱动器',
-        'adapter': '适配器',
-    }
+    # 3. 基于代码内容匹配
+    for key, desc_str in _CODE_CONTENT_RULES:
+        if any(key in content for content in contents_lower):
+            return desc_str
 
-    # 1. 基于目录名匹配
-    for key, desc in keywords_map.items():
-        if key in dir_name:
-            return desc
-
-    # 2. 基于文件名匹配
-    for file_name in file_names:
-        file_lower = file_name.lower()
-        for key, desc in keywords_map.items():
-            if key in file_lower:
-                return desc
-
-    # 3. 默认：使用目录名生成描述
+    # 4. 默认：使用目录名生成描述
     dir_display = dir_path.name
     if len(dir_display) > 10:
         dir_display = dir_display[:10]
     return f'{dir_display}相关模块'
 
+
+# propagate_summary：常见目录名 -> 描述（先出现的规则优先）
+PROPAGATE_DIRNAME_MAP = _build_name_map((
+    (('src', 'lib', 'core', 'source'), '核心源代码与业务逻辑层'),
+    (('test', 'tests', '__tests__', 'spec'), '单元测试与集成测试套件'),
+    (('api', 'apis', 'routes'), 'RESTful API 接口与路由层'),
+    (('components', 'ui', 'views', 'pages'), '前端组件与视图页面'),
+    (('hooks', 'composables'), 'React Hooks 与组合式函数'),
+    (('store', 'state', 'redux', 'vuex'), '全局状态管理与数据存储'),
+    (('styles', 'css', 'scss', 'less'), '样式表与主题配置文件'),
+    (('assets', 'static', 'public'), '静态资源与公共文件目录'),
+    (('vendor', 'node_modules', 'third_party'), '第三方库与依赖包文件'),
+    (('config', 'settings', 'env'), '系统配置与环境变量管理'),
+    (('utils', 'helpers', 'commons'), '通用工具函数与辅助类库'),
+    (('services', 'business'), '业务逻辑处理与服务层'),
+    (('models', 'entities', 'schemas'), '数据模型与实体定义层'),
+    (('controllers', 'handlers'), '控制器与请求处理层'),
+    (('middleware', 'interceptors'), '中间件与请求拦截处理'),
+    (('client', 'http', 'request'), 'HTTP 客户端与请求封装'),
+    (('server', 'app', 'main'), '应用启动与服务器配置'),
+    (('database', 'db', 'repositories'), '数据库访问与持久化操作'),
+    (('cache', 'redis', 'session'), '缓存与会话管理模块'),
+    (('logs', 'logging', 'monitor'), '日志记录与监控追踪系统'),
+    (('exceptions', 'errors', 'handlers'), '异常捕获与错误处理模块'),
+    (('events', 'listeners', 'observers'), '事件驱动与消息发布订阅'),
+    (('tasks', 'jobs', 'queues', 'workers'), '异步任务与定时调度系统'),
+    (('socket', 'websocket', 'ws', 'io'), 'WebSocket 与实时通信模块'),
+    (('storage', 'files', 'uploads'), '文件存储与上传下载管理'),
+    (('security', 'auth', 'permission'), '加密解密与安全防护模块'),
+    (('locale', 'i18n', 'translations'), '国际化与多语言支持模块'),
+    (('platform', 'core', 'kernel'), '平台核心与基础架构模块'),
+    (('cluster', 'distributed'), '集群管理与分布式协调'),
+    (('communication', 'comm', 'interfaces'), '平台通信与共享接口定义'),
+    (('plugins', 'extensions', 'addons'), '插件扩展与模块化加载'),
+    (('documentation', 'docs', 'readme'), '项目文档与使用说明'),
+))
+
+# propagate_summary 兜底：目录名包含关键词时使用的描述后缀（按顺序匹配）
+PROPAGATE_FALLBACK_RULES = (
+    ('config', '配置管理模块'),
+    ('test', '测试套件'),
+    ('api', '接口模块'),
+)
+
+
 def propagate_summary(dir_path: Path, child_summaries: List[str], root: Path) -> str:
     """
     合并子目录摘要生成父目录摘要（中文）。
@@ -760,78 +983,18 @@ def propagate_summary(dir_path: Path, child_summaries: List[str], root: Path) ->
         合并后的摘要（10~50 个中文字符）
     """
     if not child_summaries:
-        return analyze_directory_code(dir_path)
+        return analyze_directory_code(dir_path, root)
 
     dir_name = dir_path.name
 
     # 特殊处理常见目录名
-    if dir_name in ['src', 'lib', 'core', 'source']:
-        return '核心源代码与业务逻辑层'
-    elif dir_name in ['test', 'tests', '__tests__', 'spec']:
-        return '单元测试与集成测试套件'
-    elif dir_name in ['api', 'apis', 'routes']:
-        return 'RESTful API 接口与路由层'
-    elif dir_name in ['components', 'ui', 'views', 'pages']:
-        return '前端组件与视图页面'
-    elif dir_name in ['hooks', 'composables']:
-        return 'React Hooks 与组合式函数'
-    elif dir_name in ['store', 'state', 'redux', 'vuex']:
-        return '全局状态管理与数据存储'
-    elif dir_name in ['styles', 'css', 'scss', 'less']:
-        return '样式表与主题配置文件'
-    elif dir_name in ['assets', 'static', 'public']:
-        return '静态资源与公共文件目录'
-    elif dir_name in ['vendor', 'node_modules', 'third_party']:
-        return '第三方库与依赖包文件'
-    elif dir_name in ['config', 'settings', 'env']:
-        return '系统配置与环境变量管理'
-    elif dir_name in ['utils', 'helpers', 'commons']:
-        return '通用工具函数与辅助类库'
-    elif dir_name in ['services', 'business']:
-        return '业务逻辑处理与服务层'
-    elif dir_name in ['models', 'entities', 'schemas']:
-        return '数据模型与实体定义层'
-    elif dir_name in ['controllers', 'handlers']:
-        return '控制器与请求处理层'
-    elif dir_name in ['middleware', 'interceptors']:
-        return '中间件与请求拦截处理'
-    elif dir_name in ['client', 'http', 'request']:
-        return 'HTTP 客户端与请求封装'
-    elif dir_name in ['server', 'app', 'main']:
-        return '应用启动与服务器配置'
-    elif dir_name in ['database', 'db', 'repositories']:
-        return '数据库访问与持久化操作'
-    elif dir_name in ['cache', 'redis', 'session']:
-        return '缓存与会话管理模块'
-    elif dir_name in ['logs', 'logging', 'monitor']:
-        return '日志记录与监控追踪系统'
-    elif dir_name in ['exceptions', 'errors', 'handlers']:
-        return '异常捕获与错误处理模块'
-    elif dir_name in ['events', 'listeners', 'observers']:
-        return '事件驱动与消息发布订阅'
-    elif dir_name in ['tasks', 'jobs', 'queues', 'workers']:
-        return '异步任务与定时调度系统'
-    elif dir_name in ['socket', 'websocket', 'ws', 'io']:
-        return 'WebSocket 与实时通信模块'
-    elif dir_name in ['storage', 'files', 'uploads']:
-        return '文件存储与上传下载管理'
-    elif dir_name in ['security', 'auth', 'permission']:
-        return '加密解密与安全防护模块'
-    elif dir_name in ['locale', 'i18n', 'translations']:
-        return '国际化与多语言支持模块'
-    elif dir_name in ['platform', 'core', 'kernel']:
-        return '平台核心与基础架构模块'
-    elif dir_name in ['cluster', 'distributed']:
-        return '集群管理与分布式协调'
-    elif dir_name in ['communication', 'comm', 'interfaces']:
-        return '平台通信与共享接口定义'
-    elif dir_name in ['plugins', 'extensions', 'addons']:
-        return '插件扩展与模块化加载'
-    elif dir_name in ['documentation', 'docs', 'readme']:
-        return '项目文档与使用说明'
+    hit = PROPAGATE_DIRNAME_MAP.get(dir_name)
+    if hit is not None:
+        return hit
     
     # 分析子摘要的共同特征
-    unique_summaries = list(set(child_summaries))
+    # dict.fromkeys 去重并保留子目录顺序；池化后的相同描述比较退化为指针比较
+    unique_summaries = list(dict.fromkeys(child_summaries))
 
     # 特殊处理根目录或顶层目录
     if dir_path == root or dir_path.name == root.name:
@@ -877,14 +1040,10 @@ def propagate_summary(dir_path: Path, child_summaries: List[str], root: Path) ->
         dir_display = dir_display[:15]
     
     # 尝试从目录名推断功能
-    if 'config' in dir_name:
-        return f'{dir_display}配置管理模块'
-    elif 'test' in dir_name:
-        return f'{dir_display}测试套件'
-    elif 'api' in dir_name:
-        return f'{dir_display}接口模块'
-    else:
-        return f'{dir_display}功能模块组'
+    for key, suffix in PROPAGATE_FALLBACK_RULES:
+        if key in dir_name:
+            return f'{dir_display}{suffix}'
+    return f'{dir_display}功能模块组'
 
 
 def generate_modules_incremental(root: Path | None = None, batch_size: int = 5):
@@ -893,7 +1052,7 @@ def generate_modules_incremental(root: Path | None = None, batch_size: int = 5):
 
     Args:
         root: 项目根目录（默认为当前目录）
-        batch_size: 批量更新大小（默认 5 个）
+        batch_size: 进度输出间隔（默认每 5 个目录）
     """
     if root is None:
         root = Path.cwd()
@@ -901,17 +1060,17 @@ def generate_modules_incremental(root: Path | None = None, batch_size: int = 5):
     print(f"Generating modules.md for: {root}")
     print()
 
+    # 单次遍历得到目录、层级、父子索引和叶子目录，供两个阶段共用
+    directories, depth_buckets, children_map, leaf_dirs, parts_lower = scan_directory_tree(root)
+
     # 阶段 1：生成骨架
     print("=" * 60)
     print("Phase 1: Creating skeleton...")
     print("=" * 60)
-    create_skeleton_file(root)
+    create_skeleton_file(root, directories)
     print()
 
     # 准备数据结构
-    directories = find_all_directories(root)
-    leaf_dirs = get_leaf_directories(directories)
-    depth_map = get_directories_by_depth(directories, root)
     dir_summaries: Dict[Path, str] = {}
 
     print(f"Phase 1 completed. Found {len(directories)} directories, {len(leaf_dirs)} leaf dirs.")
@@ -923,80 +1082,67 @@ def generate_modules_incremental(root: Path | None = None, batch_size: int = 5):
     print("=" * 60)
     print()
 
-    # 2.1 分析叶子目录
+    # 2.1 分析叶子目录（结果汇总在 dir_summaries 中，阶段 2 结束时一次性写入）
     print(f"Analyzing {len(leaf_dirs)} leaf directories...")
-    updates = []
     processed_count = 0
-
-    for leaf_dir in leaf_dirs:
-        # 分析代码
-        summary = analyze_directory_code(leaf_dir)
-        dir_summaries[leaf_dir] = summary
-        updates.append((leaf_dir, summary))
-        processed_count += 1
-
-        # 批量更新
-        if len(updates) >= batch_size:
-            batch_update_descriptions(root, updates)
-            update_progress_header(root, get_full_path(leaf_dir, root))
-            print(f"  [{processed_count}/{len(leaf_dirs)}] Updated {len(updates)} leaf directories")
-            updates.clear()
-
-    # 更新剩余的叶子目录
-    if updates:
-        batch_update_descriptions(root, updates)
-        print(f"  [{processed_count}/{len(leaf_dirs)}] Updated {len(updates)} leaf directories")
-        updates.clear()
+    batch_count = 0
+
+    # 叶子目录相互独立，分析以读文件为主（释放 GIL），用线程池并行；
+    # 结果按原顺序返回，dir_summaries 只在主线程写入
+    max_workers = max(1, min(MAX_ANALYSIS_WORKERS, len(leaf_dirs)))
+    leaf_parts = [parts_lower[d] for d in leaf_dirs]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        summaries = executor.map(analyze_directory_code, leaf_dirs, [root] * len(leaf_dirs), leaf_parts)
+        for leaf_dir, summary in zip(leaf_dirs, summaries):
+            dir_summaries[leaf_dir] = intern_description(summary)
+            processed_count += 1
+            batch_count += 1
+
+            # 按批次输出进度
+            if batch_count >= batch_size:
+                print(f"  [{processed_count}/{len(leaf_dirs)}] Analyzed {batch_count} leaf directories")
+                batch_count = 0
+
+    if batch_count:
+        print(f"  [{processed_count}/{len(leaf_dirs)}] Analyzed {batch_count} leaf directories")
 
     print()
 
     # 2.2 分层向上传播
     print("Propagating summaries upward (by depth)...")
-    max_depth = max(depth_map.keys()) if depth_map else 0
+    # 从深到浅遍历各层级；最深一层全是叶子目录，直接跳过
+    for depth in range(len(depth_buckets) - 2, -1, -1):
+        print(f"  Depth {depth}: processing {len(depth_buckets[depth])} directories...")
 
-    for depth in range(max_depth - 1, -1, -1):
-        if depth not in depth_map:
-            continue
-
-        print(f"  Depth {depth}: processing {len(depth_map[depth])} directories...")
-
-        for dir_path in depth_map[depth]:
-            if dir_path in leaf_dirs:
+        for dir_path in depth_buckets[depth]:
+            child_dirs = children_map.get(dir_path)
+            if not child_dirs:
                 continue  # 跳过叶子目录
 
             # 获取所有子目录的摘要
-            child_dirs = [d for d in directories if d.parent == dir_path and d != dir_path]
             child_summaries = [dir_summaries.get(child, "") for child in child_dirs if child in dir_summaries]
 
             # 合并摘要
-            summary = propagate_summary(dir_path, child_summaries, root)
-            dir_summaries[dir_path] = summary
-            updates.append((dir_path, summary))
-
-            # 批量更新
-            if len(updates) >= batch_size:
-                batch_update_descriptions(root, updates)
-                update_progress_header(root, get_full_path(dir_path, root))
-                updates.clear()
-
-        # 更新当前层级的剩余目录
-        if updates:
-            batch_update_descriptions(root, updates)
-            updates.clear()
+            dir_summaries[dir_path] = intern_description(
+                propagate_summary(dir_path, child_summaries, root)
+            )
 
     print()
 
+    # 骨架按行号索引后在内存中填入所有描述并移除进度头，只写一次 modules.md
+    store = ModulesMdStore(root)
+    store.update_many(list(dir_summaries.items()))
+    store.remove_progress()
+    store.flush()
+
     # 完成
     print("=" * 60)
     print("Phase 2 completed!")
     print("=" * 60)
     print()
 
-    # 移除进度头
-    remove_progress_header(root)
-
     # ==================== 验证步骤：确保所有目录都有描述 ====================
-    validate_and_fix_missing_descriptions(root)
+    validate_and_fix_missing_descriptions(root, directories, parts_lower)
     # ========================================================================
 
     print("\n[OK] Generated modules.md successfully!")
@@ -1008,12 +1154,35 @@ def generate_modules_incremental(root: Path | None = None, batch_size: int = 5):
 # Validation and Fix Functions
 # ============================================================================
 
-def validate_and_fix_missing_descriptions(root: Path):
+def _safe_analyze_directory_code(
+    dir_path: Path,
+    root: Path,
+    parts_lower: Tuple[str, ...] | None = None,
+) -> Tuple[str, Exception | None]:
+    """
+    在线程池中调用 analyze_directory_code，把异常作为结果返回而不是抛出。
+
+    Returns:
+        (功能描述, None) 或 ("", 异常对象)
+    """
+    try:
+        return analyze_directory_code(dir_path, root, parts_lower), None
+    except Exception as e:
+        return "", e
+
+
+def validate_and_fix_missing_descriptions(
+    root: Path,
+    directories: List[Path] | None = None,
+    parts_lower: Dict[Path, Tuple[str, ...]] | None = None,
+):
     """
     验证并修复缺失的目录描述。
 
     Args:
         root: 项目根目录
+        directories: 已扫描的目录列表（默认重新扫描文件系统）
+        parts_lower: 目录 -> 小写相对路径片段（scan_directory_tree 的结果，缺失时按路径现场计算）
     """
     modules_md_path = root / "modules.md"
     if not modules_md_path.exists():
@@ -1024,23 +1193,23 @@ def validate_and_fix_missing_descriptions(root: Path):
     print("Validating module descriptions...")
     print("=" * 60)
 
-    # 1. 读取所有目录
-    directories = find_all_directories(root)
+    # 1. 读取所有目录（调用方已扫描过时直接复用）
+    if directories is None:
+        directories, _, _, _, parts_lower = scan_directory_tree(root)
+    if parts_lower is None:
+        parts_lower = {}
     print(f"Found {len(directories)} directories in filesystem.")
 
-    # 2. 解析现有的描述
-    existing_descriptions = parse_existing_descriptions(root)
+    # 2. 读取 modules.md 一次：解析现有描述，修复时也在同一份内存视图上更新
+    full_path_map = build_full_path_map(directories, root)
+    store = ModulesMdStore(root, full_path_map)
+    existing_descriptions = store.descriptions()
     print(f"Found {len(existing_descriptions)} descriptions in modules.md.")
 
-    # 3. 找出缺失或无效的描述
-    missing_or_invalid = []
-    for dir_path in directories:
-        full_path = get_full_path(dir_path, root)
-        desc = existing_descriptions.get(full_path, '')
-
-        # 检查：不存在、为空、或仍为占位符
-        if not desc or desc == '[待分析]':
-            missing_or_invalid.append(dir_path)
+    # 3. 找出缺失或无效的描述（不存在、为空、或仍为占位符）
+    missing_or_invalid = get_unanalyzed_directories(
+        directories, existing_descriptions, root, full_path_map
+    )
 
     if not missing_or_invalid:
         print("[OK] All directories have valid descriptions!")
@@ -1050,33 +1219,43 @@ def validate_and_fix_missing_descriptions(root: Path):
     print(f"\nFound {len(missing_or_invalid)} directories without valid descriptions.")
     print("Fixing missing descriptions...\n")
 
+    # 批次只更新内存中的文档，结束（或中断）时统一写回一次
     updates = []
     batch_size = 5
 
-    for dir_path in missing_or_invalid:
-        try:
-            # 分析目录代码
-            summary = analyze_directory_code(dir_path)
-            updates.append((dir_path, summary))
-
-            # 批量更新
-            if len(updates) >= batch_size:
-                batch_update_descriptions(root, updates)
-                print(f"  Fixed {len(updates)} missing descriptions")
-                updates.clear()
-
-        except Exception as e:
-            print(f"  [WARNING] Failed to analyze {dir_path}: {e}")
-            # 添加默认描述
-            dir_display = dir_path.name
-            if len(dir_display) > 10:
-                dir_display = dir_display[:10]
-            updates.append((dir_path, f"{dir_display}相关功能模块"))
-
-    # 更新剩余的
-    if updates:
-        batch_update_descriptions(root, updates)
-        print(f"  Fixed {len(updates)} missing descriptions")
+    # 各目录的分析相互独立，用线程池并行；异常在工作线程中捕获，
+    # 警告和默认描述仍按原顺序在主线程处理
+    max_workers = max(1, min(MAX_ANALYSIS_WORKERS, len(missing_or_invalid)))
+    missing_parts = [parts_lower.get(d) for d in missing_or_invalid]
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for dir_path, (summary, error) in zip(
+                missing_or_invalid,
+                executor.map(_safe_analyze_directory_code, missing_or_invalid, [root] * len(missing_or_invalid), missing_parts),
+            ):
+                if error is None:
+                    updates.append((dir_path, summary))
+
+                    # 批量更新
+                    if len(updates) >= batch_size:
+                        store.update_many(updates)
+                        print(f"  Fixed {len(updates)} missing descriptions")
+                        updates.clear()
+                else:
+                    print(f"  [WARNING] Failed to analyze {dir_path}: {error}")
+                    # 添加默认描述
+                    dir_display = dir_path.name
+                    if len(dir_display) > 10:
+                        dir_display = dir_display[:10]
+                    updates.append((dir_path, f"{dir_display}相关功能模块"))
+
+        # 更新剩余的
+        if updates:
+            store.update_many(updates)
+            print(f"  Fixed {len(updates)} missing descriptions")
+    finally:
+        store.flush()
 
     print("\n[OK] Validation and fix completed!")
 
@@ -1089,7 +1268,6 @@ def backup_existing_modules(root: Path) -> Path | None:
     """
     备份现有的 modules.md 文件。
     """
-    from datetime import datetime
     import shutil
 
     modules_md_path = root / 'modules.md'
@@ -1111,52 +1289,81 @@ def parse_existing_descriptions(root: Path) -> Dict[str, str]:
     if not modules_md_path.exists():
         return {}
 
+    with open(modules_md_path, encoding='utf-8') as f:
+        return _parse_description_lines(f)
+
+
+def _parse_description_lines(lines: Iterable[str]) -> Dict[str, str]:
+    """
+    从 modules.md 的行中提取「完整路径 - 描述」条目。
+
+    Args:
+        lines: 文件的各行（可带或不带换行符），文件对象或 ModulesMdStore.lines 均可
+
+    Returns:
+        完整路径 -> 描述 的字典
+    """
     descriptions = {}
     in_descriptions_section = False
 
-    with open(modules_md_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if line == '## Module Descriptions':
+    # 先用子串预筛，只有可能命中的行才 strip
+    for raw in lines:
+        if not in_descriptions_section:
+            if '## Module Descriptions' in raw and raw.strip() == '## Module Descriptions':
                 in_descriptions_section = True
-                continue
-            if in_descriptions_section and line.startswith('##'):
-                break
-            if in_descriptions_section and ' - ' in line and not line.startswith('<!--'):
-                path, desc = line.split(' - ', 1)
-                descriptions[path] = desc
+            continue
+        if ' - ' not in raw and '##' not in raw:
+            continue
+        line = raw.strip()
+        if line == '## Module Descriptions':
+            continue
+        if line.startswith('##'):
+            break
+        if ' - ' in line and not line.startswith('<!--'):
+            path, _, desc = line.partition(' - ')
+            descriptions[path] = desc
 
     return descriptions
 
 
-def get_unanalyzed_directories(directories, existing_descriptions, root):
+def get_unanalyzed_directories(directories, existing_descriptions, root, full_path_map=None):
     """
     获取未分析的目录（描述为 [待分析] 或不存在）。
+
+    full_path_map 为 build_full_path_map 的结果，未提供时现场计算。
     """
+    if full_path_map is None:
+        full_path_map = build_full_path_map(directories, root)
     unanalyzed = []
     for dir_path in directories:
-        full_path = get_full_path(dir_path, root)
+        full_path = full_path_map[dir_path]
         desc = existing_descriptions.get(full_path, '')
         if not desc or desc == '[待分析]':
             unanalyzed.append(dir_path)
     return unanalyzed
 
 
-def get_new_directories(directories, existing_descriptions, root):
+def get_new_directories(directories, existing_descriptions, root, full_path_map=None):
     """
     获取新增的目录。
+
+    full_path_map 为 build_full_path_map 的结果，未提供时现场计算。
     """
+    if full_path_map is None:
+        full_path_map = build_full_path_map(directories, root)
     new_dirs = []
     for dir_path in directories:
-        full_path = get_full_path(dir_path, root)
+        full_path = full_path_map[dir_path]
         if full_path not in existing_descriptions:
             new_dirs.append(dir_path)
     return new_dirs
 
 
-def interactive_mode(root):
+def interactive_mode(root, directories=None):
     """
     交互式模式：检测重复执行并询问用户选择。
+
+    directories 为已扫描的目录列表，未提供时在提示前扫描一次。
     """
     modules_md_path = root / 'modules.md'
 
@@ -1164,6 +1371,63 @@ def interactive_mode(root):
         generate_modules_incremental(root)
         return
 
+    # 选项 2/3 所需的目录和现有描述在提示前准备一次，输入无效时重试也无需重新扫描；
+    # modules.md 只读取一次，解析出的描述和后续的更新共用同一份内存视图
+    parts_lower = None
+    if directories is None:
+        directories, _, _, _, parts_lower = scan_directory_tree(root)
+    full_path_map = build_full_path_map(directories, root)
+    store = ModulesMdStore(root, full_path_map)
+    existing_descriptions = store.descriptions()
+
+    def overwrite():
+        backup_existing_modules(root)
+        modules_md_path.unlink()
+        generate_modules_incremental(root)
+
+    def full_overwrite():
+        print()
+        print('Option 1: Full overwrite...')
+        overwrite()
+
+    def continue_unanalyzed():
+        print()
+        print('Option 2: Continuing unanalyzed directories...')
+        unanalyzed = get_unanalyzed_directories(directories, existing_descriptions, root, full_path_map)
+
+        if not unanalyzed:
+            print('No unanalyzed directories found. All directories are already analyzed!')
+            return
+
+        print(f'Found {len(unanalyzed)} unanalyzed directories to process.')
+        print()
+        process_incremental_update(
+            root, unanalyzed, existing_descriptions, directories, full_path_map,
+            progress_label='Processing unanalyzed directories', store=store, parts_lower=parts_lower,
+        )
+
+    def check_new():
+        print()
+        print('Option 3: Checking new directories...')
+        new_dirs = get_new_directories(directories, existing_descriptions, root, full_path_map)
+
+        if not new_dirs:
+            print('No new directories found. All directories are already in the list!')
+            return
+
+        print(f'Found {len(new_dirs)} new directories to process.')
+        print()
+        process_incremental_update(
+            root, new_dirs, existing_descriptions, directories, full_path_map,
+            progress_label='Processing new directories', store=store, parts_lower=parts_lower,
+        )
+
+    handlers = {
+        '1': full_overwrite,
+        '2': continue_unanalyzed,
+        '3': check_new,
+    }
+
     print('=' * 60)
     print('Existing modules.md detected!')
     print('=' * 60)
@@ -1173,55 +1437,16 @@ def interactive_mode(root):
     print('  2. Continue unanalyzed directories (skip [待分析] only)')
     print('  3. Check new directories only (not in existing list)')
     print()
-    
+
     while True:
         try:
             choice = input('Your choice (1/2/3): ').strip()
-
-            if choice == '1':
-                print()
-                print('Option 1: Full overwrite...')
-                backup_existing_modules(root)
-                modules_md_path.unlink()
-                generate_modules_incremental(root)
-                break
-
-            elif choice == '2':
-                print()
-                print('Option 2: Continuing unanalyzed directories...')
-                existing_descriptions = parse_existing_descriptions(root)
-                directories = find_all_directories(root)
-                unanalyzed = get_unanalyzed_directories(directories, existing_descriptions, root)
-                
-                if not unanalyzed:
-                    print('No unanalyzed directories found. All directories are already analyzed!')
-                    return
-
-                print(f'Found {len(unanalyzed)} unanalyzed directories to process.')
-                print()
-                update_progress_header(root, 'Processing unanalyzed directories')
-                process_incremental_update(root, unanalyzed, existing_descriptions)
-                break
-
-            elif choice == '3':
-                print()
-                print('Option 3: Checking new directories...')
-                existing_descriptions = parse_existing_descriptions(root)
-                directories = find_all_directories(root)
-                new_dirs = get_new_directories(directories, existing_descriptions, root)
-                
-                if not new_dirs:
-                    print('No new directories found. All directories are already in the list!')
-                    return
-
-                print(f'Found {len(new_dirs)} new directories to process.')
-                print()
-                update_progress_header(root, 'Processing new directories')
-                process_incremental_update(root, new_dirs, existing_descriptions)
-                break
-
-            else:
+            handler = handlers.get(choice)
+            if handler is None:
                 print('Invalid choice. Please enter 1, 2, or 3.')
+                continue
+            handler()
+            break
         except KeyboardInterrupt:
             print()
             print('Operation cancelled.')
@@ -1229,55 +1454,98 @@ def interactive_mode(root):
         except EOFError:
             print()
             print('Non-interactive mode detected. Using option 1 (full overwrite)...')
-            backup_existing_modules(root)
-            modules_md_path.unlink()
-            generate_modules_incremental(root)
+            overwrite()
             break
 
 
-def process_incremental_update(root, target_dirs, existing_descriptions):
+def process_incremental_update(
+    root, target_dirs, existing_descriptions, directories=None, full_path_map=None,
+    progress_label=None, store=None, parts_lower=None,
+):
     """
     处理增量更新（用于选项 2 和 3）。
+
+    directories 为已扫描的目录列表，未提供时重新扫描；
+    full_path_map 为对应的完整路径映射，未提供时现场计算；
+    progress_label 为开始处理前写入进度头的说明（为空时不设置）；
+    store 为调用方已读取的 ModulesMdStore，未提供时读取 modules.md 新建；
+    parts_lower 为 scan_directory_tree 得到的目录 -> 小写相对路径片段，缺失时按路径现场计算。
     """
-    directories = find_all_directories(root)
+    # 调用方传入的是列表，转为 frozenset 使层级循环中的成员判断为 O(1)
+    target_dirs = frozenset(target_dirs)
+    if directories is None:
+        directories, _, _, _, parts_lower = scan_directory_tree(root)
+    if parts_lower is None:
+        parts_lower = {}
+    if full_path_map is None:
+        full_path_map = build_full_path_map(directories, root)
     dir_summaries = {}
     batch_size = 5
-    depth_map = get_directories_by_depth(directories, root)
-    max_depth = max(depth_map.keys()) if depth_map else 0
+    depth_buckets = get_directories_by_depth(directories, root)
+    # 父目录 -> 子目录索引，避免每个目录都线性扫描全部目录
+    children_index: Dict[Path, List[Path]] = {}
+    for d in directories:
+        parent = d.parent
+        if parent != d:  # Path('.').parent 仍是自身
+            children_index.setdefault(parent, []).append(d)
+    # 没有子目录的即为叶子；与索引同源，循环外计算一次
+    leaf_dirs = frozenset(d for d in directories if d not in children_index)
+    # 批次只更新内存中的文档，结束（或中断）时统一写回一次
+    if store is None:
+        store = ModulesMdStore(root, full_path_map)
+    if progress_label:
+        store.set_progress(progress_label)
     updates = []
 
-    for depth in range(max_depth, -1, -1):
-        if depth not in depth_map:
-            continue
-        for dir_path in depth_map[depth]:
-            if dir_path not in target_dirs:
-                continue
-            leaf_dirs = get_leaf_directories(directories)
-            if dir_path in leaf_dirs:
-                summary = analyze_directory_code(dir_path)
-            else:
-                child_dirs = [d for d in directories if d.parent == dir_path and d != dir_path]
-                child_summaries = []
-                for child in child_dirs:
-                    full_path = get_full_path(child, root)
-                    if child in dir_summaries:
-                        child_summaries.append(dir_summaries[child])
-                    elif full_path in existing_descriptions:
-                        child_summaries.append(existing_descriptions[full_path])
-                summary = propagate_summary(dir_path, child_summaries, root)
-            dir_summaries[dir_path] = summary
-            updates.append((dir_path, summary))
-            if len(updates) >= batch_size:
-                batch_update_descriptions(root, updates)
-                update_progress_header(root, get_full_path(dir_path, root))
-                print(f'  Updated {len(updates)} directories')
-                updates.clear()
-
-    if updates:
-        batch_update_descriptions(root, updates)
-        print(f'  Updated {len(updates)} directories')
-
-    remove_progress_header(root)
+    def summarize(job):
+        dir_path, child_summaries = job
+        if child_summaries is None:
+            return analyze_directory_code(dir_path, root, parts_lower.get(dir_path))
+        return propagate_summary(dir_path, child_summaries, root)
+
+    # 同一层级的目录只依赖更深层级的结果，层内用线程池并行分析；
+    # 子目录摘要在主线程中收集好再提交，dir_summaries 只在主线程写入。
+    # 每层要处理的目录与分析结果无关，按最大的一层确定线程数，没有目标时不建线程池
+    target_buckets = [
+        [d for d in bucket if d in target_dirs] for bucket in reversed(depth_buckets)
+    ]
+    max_jobs = max(map(len, target_buckets), default=0)
+    try:
+        if max_jobs:
+            with ThreadPoolExecutor(max_workers=min(MAX_ANALYSIS_WORKERS, max_jobs)) as executor:
+                for targets in target_buckets:
+                    jobs = []
+                    for dir_path in targets:
+                        if dir_path in leaf_dirs:
+                            jobs.append((dir_path, None))
+                            continue
+                        child_summaries = []
+                        for child in children_index.get(dir_path, []):
+                            full_path = full_path_map[child]
+                            if child in dir_summaries:
+                                child_summaries.append(dir_summaries[child])
+                            elif full_path in existing_descriptions:
+                                child_summaries.append(existing_descriptions[full_path])
+                        jobs.append((dir_path, child_summaries))
+
+                    for (dir_path, _), summary in zip(jobs, executor.map(summarize, jobs)):
+                        summary = intern_description(summary)
+                        dir_summaries[dir_path] = summary
+                        updates.append((dir_path, summary))
+                        if len(updates) >= batch_size:
+                            store.update_many(updates)
+                            store.set_progress(full_path_map[dir_path])
+                            print(f'  Updated {len(updates)} directories')
+                            updates.clear()
+
+        if updates:
+            store.update_many(updates)
+            print(f'  Updated {len(updates)} directories')
+
+        # 正常完成时连同进度头的移除一起写回；中断时保留最后的进度头
+        store.remove_progress()
+    finally:
+        store.flush()
     print()
     print('[OK] Incremental update completed!')
     print(f'  Directories processed: {len(target_dirs)}')
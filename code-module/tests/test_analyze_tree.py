@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Automated tests for code-module skill
+"""
+
+import contextlib
+import importlib.util
+import io
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Colors for output
+GREEN = "\033[92m"
+RED = "\033[91m"
+RESET = "\033[0m"
+
+
+def load_analyze_tree():
+    """Load scripts/analyze_tree.py as a module."""
+    script = Path(__file__).parent.parent / "scripts" / "analyze_tree.py"
+    spec = importlib.util.spec_from_file_location("analyze_tree", script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_project(base: Path) -> Path:
+    """Create a small project whose directory names contain the ' - ' separator."""
+    root = base / "proj"
+    for rel in ("foo - bar", "src/api", "src/ - dash"):
+        (root / rel).mkdir(parents=True)
+        (root / rel / "main.py").write_text("def handler():\n    pass\n", encoding='utf-8')
+    return root
+
+
+def test_store_indexes_separator_in_name():
+    """Test that ModulesMdStore updates directories whose name contains ' - '."""
+    print("Test 1: ModulesMdStore with ' - ' in directory names... ", end="")
+
+    analyze_tree = load_analyze_tree()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_project(Path(tmp))
+        directories = analyze_tree.find_all_directories(root)
+        with contextlib.redirect_stdout(io.StringIO()):
+            analyze_tree.create_skeleton_file(root, directories)
+
+        store = analyze_tree.ModulesMdStore(root, analyze_tree.build_full_path_map(directories, root))
+        store.update_many([(d, f"desc of {d.name}") for d in directories])
+        store.flush()
+
+        descriptions = analyze_tree.parse_existing_descriptions(root)
+        content = (root / "modules.md").read_text(encoding='utf-8')
+        for rel in ("foo - bar", "src/ - dash"):
+            line = f"proj/{rel}/ - desc of {Path(rel).name}"
+            if line not in content.split('\n'):
+                print(f"{RED}FAIL{RESET} - proj/{rel}/ was not updated")
+                return False
+        if "[待分析]" in "\n".join(descriptions.values()):
+            print(f"{RED}FAIL{RESET} - Some directories are still unanalyzed")
+            return False
+
+    print(f"{GREEN}PASS{RESET} - All directories updated")
+    return True
+
+
+def test_incremental_fills_separator_in_name():
+    """Test that a full incremental run leaves no '[待分析]' lines."""
+    print("Test 2: Incremental run with ' - ' in directory names... ", end="")
+
+    analyze_tree = load_analyze_tree()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_project(Path(tmp))
+        with contextlib.redirect_stdout(io.StringIO()):
+            analyze_tree.generate_modules_incremental(root)
+
+        content = (root / "modules.md").read_text(encoding='utf-8')
+        pending = [line for line in content.split('\n') if line.endswith(" - [待分析]")]
+        if pending:
+            print(f"{RED}FAIL{RESET} - Still unanalyzed: {pending}")
+            return False
+
+    print(f"{GREEN}PASS{RESET} - All directories analyzed")
+    return True
+
+
+def test_dot_root_uses_real_name():
+    """Test that a root given as '.' is classified by its real directory name."""
+    print("Test 3: Root given as '.'... ", end="")
+
+    analyze_tree = load_analyze_tree()
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / "tests").mkdir()
+        cwd = os.getcwd()
+        os.chdir(Path(tmp) / "tests")
+        try:
+            root = Path(".")
+            _, _, _, _, parts_lower = analyze_tree.scan_directory_tree(root)
+            results = {
+                analyze_tree.analyze_by_path(root, root, parts_lower[root]),
+                analyze_tree.analyze_by_path(root, root),
+            }
+        finally:
+            os.chdir(cwd)
+
+    if results != {"测试用例"}:
+        print(f"{RED}FAIL{RESET} - Unexpected descriptions: {sorted(results)}")
+        return False
+
+    print(f"{GREEN}PASS{RESET} - Root classified as 测试用例")
+    return True
+
+
+def run_all_tests():
+    """Run all tests and report results."""
+    print("=" * 60)
+    print("Running code-module Skill Tests")
+    print("=" * 60)
+    print()
+
+    tests = [
+        test_store_indexes_separator_in_name,
+        test_incremental_fills_separator_in_name,
+        test_dot_root_uses_real_name,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test_func in tests:
+        if test_func():
+            passed += 1
+        else:
+            failed += 1
+        print()
+
+    # Summary
+    print("=" * 60)
+    print("Test Summary")
+    print("=" * 60)
+    print(f"Total: {len(tests)} tests")
+    print(f"{GREEN}Passed: {passed}{RESET}")
+    print(f"{RED}Failed: {failed}{RESET}")
+    print()
+
+    if failed == 0:
+        print(f"{GREEN}All tests passed!{RESET}")
+        return 0
+    else:
+        print(f"{RED}Some tests failed.{RESET}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
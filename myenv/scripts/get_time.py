@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 import json
+import locale
 import platform
-from datetime import datetime
+import time
+from datetime import datetime, timezone
 import sys
 
 try:
@@ -9,10 +11,14 @@ try:
 except ImportError:
     pytz = None
 
+try:
+    import tzlocal
+except ImportError:
+    tzlocal = None
+
 def get_system_language():
     """Get system language setting."""
     try:
-        import locale
         lang = locale.getlocale()[0]
         return lang if lang else "unknown"
     except:
@@ -22,25 +28,24 @@ def get_timezone_info():
     """Get timezone information."""
     try:
         if pytz:
-            import tzlocal
+            if tzlocal is None:
+                return "UTC"
             local_tz = tzlocal.get_localzone()
             return str(local_tz)
         else:
-            import time
             return time.tzname[0] or "UTC"
     except:
         return "UTC"
 
-def get_utc_offset():
-    """Get UTC offset in +HH:MM format."""
+def get_utc_offset(now_local):
+    """Get UTC offset of an aware local datetime in +HH:MM format."""
     try:
-        import time
-        # Use time.timezone to get offset (note: negative because time.timezone is opposite sign)
-        offset_seconds = -time.timezone if time.daylight == 0 else -time.altzone
-        hours = offset_seconds // 3600
-        minutes = (abs(offset_seconds) % 3600) // 60
-        sign = '+' if hours >= 0 else '-'
-        return f"{sign}{abs(hours):02d}:{minutes:02d}"
+        # utcoffset() reflects whether DST is in effect at that moment
+        offset_seconds = int(now_local.utcoffset().total_seconds())
+        sign = '+' if offset_seconds >= 0 else '-'
+        hours, remainder = divmod(abs(offset_seconds), 3600)
+        minutes = remainder // 60
+        return f"{sign}{hours:02d}:{minutes:02d}"
     except:
         return "+00:00"
 
@@ -64,16 +69,13 @@ def get_os_info():
 
 def main():
     """Main function to get time information."""
-    # Get current times
-    now_local = datetime.now()
-    import warnings
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore")
-        now_utc = datetime.utcnow()
+    # Get current time once; local time is the same instant converted to the local zone
+    now_utc = datetime.now(timezone.utc)
+    now_local = now_utc.astimezone()
     
     # Get timezone info
-    timezone = get_timezone_info()
-    utc_offset = get_utc_offset()
+    tz_name = get_timezone_info()
+    utc_offset = get_utc_offset(now_local)
     
     # Format times
     local_time = now_local.strftime('%Y-%m-%d %H:%M:%S')
@@ -85,7 +87,7 @@ def main():
     
     # Build output
     result = {
-        'timezone': timezone,
+        'timezone': tz_name,
         'utc_offset': utc_offset,
         'local_time': local_time,
         'utc_time': utc_time,
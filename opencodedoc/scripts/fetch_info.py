@@ -4,76 +4,248 @@ OpenCode Information Fetcher
 Dynamically fetches current information about OpenCode and oh-my-opencode from GitHub API.
 """
 
+import gzip
 import json
+import os
 import sys
+import tempfile
+import threading
 import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 except ImportError:
     requests = None
     print("ERROR: requests library not installed. Run: pip install requests", file=sys.stderr)
     sys.exit(1)
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configuration
 OPENCODE_REPO = "anomalyco/opencode"
 OHMY_REPO = "code-yeongyu/oh-my-opencode"
 GITHUB_API_BASE = "https://api.github.com/repos"
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
 CACHE_TTL_SECONDS = 3600  # 1 hour
+MAX_FETCH_WORKERS = 4  # one thread per GitHub request issued by a query
+GITHUB_HEADERS = {"Accept": "application/vnd.github+json"}
+MAX_RATE_LIMIT_WAIT = 15  # seconds; wait for a rate-limit reset only if it is this close
 
-# Cache file path
-CACHE_FILE = Path(__file__).parent.parent / ".fetch_cache.json"
+# Cache file path: per-user cache directory (XDG), so read-only installs still get a cache
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "opencodedoc"
+CACHE_FILE = CACHE_DIR / "fetch_cache.json.gz"
 
 
-def load_cache():
-    """Load cached data if available and fresh."""
-    if not CACHE_FILE.exists():
-        return None
+def build_session():
+    """Create a session that keeps connections to the GitHub API alive between requests."""
+    session = requests.Session()
+    # Pool sized for the concurrent fetches; transient server errors are retried with
+    # a short exponential backoff. Retry-After is not honoured here (urllib3 would sleep
+    # for however long the server asks); rate limits go through rate_limit_wait() instead
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=False,
+    )
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=MAX_FETCH_WORKERS, max_retries=retry)
+    session.mount("https://", adapter)
+    session.headers.update(GITHUB_HEADERS)
+    return session
 
-    try:
-        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-            cache = json.load(f)
 
-        # Check if cache is still valid
-        cache_time = datetime.fromisoformat(cache.get('timestamp', ''))
-        if datetime.now() - cache_time < timedelta(seconds=CACHE_TTL_SECONDS):
-            return cache.get('data')
-    except Exception:
-        return None
+# Shared by all fetchers so the TLS handshake with api.github.com happens once per run
+SESSION = build_session()
+
+
+def dumps_json(data):
+    """Serialize data to compact UTF-8 JSON bytes (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
 
+def loads_json(raw):
+    """Parse JSON bytes (orjson when available); raises a ValueError subclass on bad input."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
 
-def save_cache(data):
-    """Save data to cache with timestamp."""
+
+# Cached GitHub responses keyed by URL ({url: {etag, data, timestamp}}), loaded on first use.
+# Every query type is derived from these entries, so each endpoint is fetched at most once per TTL.
+_responses = None
+_responses_dirty = False
+_responses_lock = threading.Lock()
+
+
+def load_cache():
+    """Return the shared per-URL response cache, reading the cache file on first use."""
+    global _responses
+    with _responses_lock:
+        if _responses is None:
+            try:
+                with open(CACHE_FILE, 'rb') as f:
+                    cache = loads_json(gzip.decompress(f.read()))
+                responses = cache.get('responses') if isinstance(cache, dict) else None
+            except (OSError, EOFError, zlib.error, ValueError):
+                # Missing, truncated or corrupt cache file: start empty
+                responses = None
+            _responses = responses if isinstance(responses, dict) else {}
+        return _responses
+
+
+def save_cache():
+    """Write the per-URL response cache back to disk if any entry changed."""
+    global _responses_dirty
+    with _responses_lock:
+        if not _responses_dirty:
+            return
+        cache_data = {'responses': _responses}
+        _responses_dirty = False
     try:
-        cache_data = {
-            'timestamp': datetime.now().isoformat(),
-            'data': data
-        }
-        with open(CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(cache_data, f, indent=2, ensure_ascii=False)
+        write_cache_atomic(CACHE_FILE, cache_data)
     except Exception as e:
         print(f"WARNING: Failed to save cache: {e}", file=sys.stderr)
 
 
+def write_cache_atomic(path, data):
+    """Write gzip-compressed compact JSON to a temp file next to path, then rename it over path."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # A crash mid-write leaves the old file intact instead of a truncated one;
+    # release bodies compress well, and level 1 keeps the compression cost negligible
+    tmp = tempfile.NamedTemporaryFile(
+        'wb', dir=path.parent, prefix=f".{path.name}.", suffix='.tmp', delete=False
+    )
+    try:
+        with tmp:
+            tmp.write(gzip.compress(dumps_json(data), compresslevel=1))
+        os.replace(tmp.name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp.name)
+        except OSError:
+            pass
+        raise
+
+
+def is_fresh(entry):
+    """Check whether a cached response is younger than CACHE_TTL_SECONDS."""
+    try:
+        cache_time = datetime.fromisoformat(entry.get('timestamp', ''))
+    except (AttributeError, TypeError, ValueError):
+        return False
+    return datetime.now() - cache_time < timedelta(seconds=CACHE_TTL_SECONDS)
+
+
+def store_response(url, data, etag=None):
+    """Record a response in the cache (thread-safe); it is written out by save_cache()."""
+    global _responses_dirty
+    responses = load_cache()
+    with _responses_lock:
+        responses[url] = {
+            "etag": etag,
+            "data": data,
+            "timestamp": datetime.now().isoformat()
+        }
+        _responses_dirty = True
+
+
+def fetch_github_json(url, parse):
+    """
+    GET a GitHub API URL and return parse(body).
+
+    A fresh cached copy is returned without any request. Otherwise the ETag of
+    the earlier response is sent as If-None-Match; on 304 Not Modified the
+    stored copy is reused without downloading the body again (304s are also
+    not counted against GitHub's rate limit).
+    """
+    cached = load_cache().get(url)
+    if cached and is_fresh(cached):
+        return cached["data"]
+    headers = {"If-None-Match": cached["etag"]} if cached and cached.get("etag") else None
+
+    response = SESSION.get(url, timeout=10, headers=headers)
+    wait = rate_limit_wait(response)
+    if wait is not None:
+        time.sleep(wait)
+        response = SESSION.get(url, timeout=10, headers=headers)
+    if response.status_code == 304 and cached:
+        store_response(url, cached["data"], cached["etag"])
+        return cached["data"]
+    response.raise_for_status()
+
+    data = parse(response.json())
+    store_response(url, data, response.headers.get("ETag"))
+    return data
+
+
+def rate_limit_wait(response):
+    """
+    Return seconds to sleep before retrying a rate-limited response, or None.
+
+    GitHub answers an exhausted primary rate limit with 403/429 plus
+    X-RateLimit-Remaining: 0 and the reset time in X-RateLimit-Reset; secondary
+    rate limits send Retry-After instead. Only waits within MAX_RATE_LIMIT_WAIT
+    are honoured; the script should not hang.
+    """
+    if response.status_code not in (403, 429):
+        return None
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is not None:
+        try:
+            wait = float(retry_after)
+        except ValueError:
+            return None
+        return wait if 0 <= wait <= MAX_RATE_LIMIT_WAIT else None
+    if response.headers.get("X-RateLimit-Remaining") != "0":
+        return None
+    try:
+        wait = int(response.headers["X-RateLimit-Reset"]) - time.time()
+    except (KeyError, ValueError):
+        return None
+    if wait > MAX_RATE_LIMIT_WAIT:
+        return None
+    # One extra second covers clock skew with GitHub, but never past the cap
+    return min(max(wait, 0) + 1, MAX_RATE_LIMIT_WAIT)
+
+
+def release_fields(data):
+    """Pick the fields used from a releases/latest response."""
+    return {
+        "tag_name": data.get("tag_name", ""),
+        "name": data.get("name", ""),
+        "published_at": data.get("published_at", ""),
+        "body": data.get("body", "") or ""
+    }
+
+
+def repo_fields(data):
+    """Pick the fields used from a repository response."""
+    return {
+        "stars": data.get("stargazers_count", 0),
+        "forks": data.get("forks_count", 0),
+        "license": data.get("license", {}).get("name", "Unknown")
+    }
+
+
 def fetch_github_release(repo):
     """Fetch latest release info from GitHub API."""
     if requests is None:
         return {"error": "requests library not available"}
 
     try:
-        url = f"{GITHUB_API_BASE}/{repo}/releases/latest"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-
-        data = response.json()
-        return {
-            "tag_name": data.get("tag_name", ""),
-            "name": data.get("name", ""),
-            "published_at": data.get("published_at", ""),
-            "body": data.get("body", "") or ""
-        }
+        return fetch_github_json(f"{GITHUB_API_BASE}/{repo}/releases/latest", release_fields)
     except Exception as e:
         return {"error": f"Failed to fetch release: {str(e)}"}
 
@@ -84,34 +256,140 @@ def fetch_github_repo_info(repo):
         return {"error": "requests library not available"}
 
     try:
-        url = f"{GITHUB_API_BASE}/{repo}"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-
-        data = response.json()
-        return {
-            "stars": data.get("stargazers_count", 0),
-            "forks": data.get("forks_count", 0),
-            "license": data.get("license", {}).get("name", "Unknown")
-        }
+        return fetch_github_json(f"{GITHUB_API_BASE}/{repo}", repo_fields)
     except Exception as e:
         return {"error": f"Failed to fetch repo info: {str(e)}"}
 
 
-def get_latest_versions():
-    """Fetch latest versions for OpenCode and oh-my-opencode."""
-    cache = load_cache()
-    if cache and 'versions' in cache:
-        print(f"[CACHE] Using cached version data")
-        return cache['versions']
+# Fields requested per repository; together they cover both REST endpoints
+GRAPHQL_REPO_FIELDS = (
+    "stargazerCount forkCount licenseInfo { name } "
+    "latestRelease { tagName name publishedAt description }"
+)
+
+
+def graphql_cache_key(repos):
+    """Cache key for the combined GraphQL result of a repo set."""
+    return f"{GITHUB_GRAPHQL_URL}?repos={','.join(repos)}"
+
 
-    print("[FETCH] Fetching latest versions from GitHub...")
+def fetch_github_graphql(repos):
+    """
+    Fetch release and repo info for several repos in a single GraphQL query.
 
-    opencode_release = fetch_github_release(OPENCODE_REPO)
-    ohmy_release = fetch_github_release(OHMY_REPO)
+    Returns {repo: (release, info)} in the same shape as the REST fetchers, or
+    None when GITHUB_TOKEN is not set (GraphQL requires auth) or the query fails.
+    """
+    token = os.environ.get("GITHUB_TOKEN")
+    if not token:
+        return None
+
+    # GraphQL is a POST without ETags, so the combined result is cached under a per-repo-set key
+    cache_key = graphql_cache_key(repos)
+    cached = load_cache().get(cache_key)
+    if cached and is_fresh(cached):
+        return {repo: tuple(pair) for repo, pair in cached["data"].items()}
+
+    # One aliased repository() field per repo, so all of them come back in one round trip
+    aliases = {f"repo{i}": repo for i, repo in enumerate(repos)}
+    fields = []
+    for alias, repo in aliases.items():
+        owner, _, name = repo.partition("/")
+        fields.append(
+            f"{alias}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) "
+            f"{{ {GRAPHQL_REPO_FIELDS} }}"
+        )
+    query = "query { " + " ".join(fields) + " }"
+
+    try:
+        response = SESSION.post(
+            GITHUB_GRAPHQL_URL,
+            json={"query": query},
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=10,
+        )
+        response.raise_for_status()
+        payload = response.json()
+        if payload.get("errors"):
+            return None
+        data = payload["data"]
+    except Exception:
+        return None
+
+    result = {}
+    for alias, repo in aliases.items():
+        node = data.get(alias) or {}
+        release = node.get("latestRelease") or {}
+        license_info = node.get("licenseInfo") or {}
+        result[repo] = (
+            {
+                "tag_name": release.get("tagName", ""),
+                "name": release.get("name", ""),
+                "published_at": release.get("publishedAt", ""),
+                "body": release.get("description", "") or ""
+            },
+            {
+                "stars": node.get("stargazerCount", 0),
+                "forks": node.get("forkCount", 0),
+                "license": license_info.get("name", "Unknown")
+            },
+        )
+    store_response(cache_key, result)
+    return result
+
+
+def fetch_concurrently(*calls):
+    """Run (func, arg) fetches in parallel threads and return results in call order."""
+    with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(calls))) as executor:
+        futures = [executor.submit(func, arg) for func, arg in calls]
+        return [future.result() for future in futures]
+
+
+def is_repo_data_cached(repos, include_info=True):
+    """Check whether fetch_repo_data() would be answered from fresh cache entries alone."""
+    if os.environ.get("GITHUB_TOKEN"):
+        keys = [graphql_cache_key(repos)]
+    else:
+        keys = [f"{GITHUB_API_BASE}/{repo}/releases/latest" for repo in repos]
+        if include_info:
+            keys += [f"{GITHUB_API_BASE}/{repo}" for repo in repos]
+    responses = load_cache()
+    return all(key in responses and is_fresh(responses[key]) for key in keys)
+
+
+def fetch_repo_data(repos, include_info=True):
+    """
+    Fetch {repo: (release, info)} for the given repos.
+
+    Uses one GraphQL query when a token is available, otherwise concurrent REST
+    calls (repo info is skipped, and left empty, when include_info is False).
+    Responses come from the per-URL cache while fresh; new ones are saved to it.
+    """
+    result = fetch_github_graphql(repos)
+    if result is None:
+        calls = [(fetch_github_release, repo) for repo in repos]
+        if include_info:
+            calls += [(fetch_github_repo_info, repo) for repo in repos]
+        responses = fetch_concurrently(*calls)
+        releases = responses[:len(repos)]
+        infos = responses[len(repos):] or [{} for _ in repos]
+        result = {repo: (release, info) for repo, release, info in zip(repos, releases, infos)}
+
+    save_cache()
+    return result
+
+
+def get_latest_versions():
+    """Fetch latest versions for OpenCode and oh-my-opencode."""
+    repos = (OPENCODE_REPO, OHMY_REPO)
+    if is_repo_data_cached(repos):
+        print("[CACHE] Using cached version data")
+    else:
+        print("[FETCH] Fetching latest versions from GitHub...")
 
-    opencode_info = fetch_github_repo_info(OPENCODE_REPO)
-    ohmy_info = fetch_github_repo_info(OHMY_REPO)
+    repo_data = fetch_repo_data(repos)
+    opencode_release, opencode_info = repo_data[OPENCODE_REPO]
+    ohmy_release, ohmy_info = repo_data[OHMY_REPO]
 
     result = {
         "opencode": {
@@ -132,23 +410,20 @@ def get_latest_versions():
         }
     }
 
-    # Save to cache
-    save_cache({'versions': result})
-
     return result
 
 
 def get_changelog():
     """Fetch recent changelog entries."""
-    cache = load_cache()
-    if cache and 'changelog' in cache:
-        print(f"[CACHE] Using cached changelog")
-        return cache['changelog']
+    repos = (OPENCODE_REPO, OHMY_REPO)
+    if is_repo_data_cached(repos, include_info=False):
+        print("[CACHE] Using cached changelog")
+    else:
+        print("[FETCH] Fetching changelog from GitHub...")
 
-    print("[FETCH] Fetching changelog from GitHub...")
-
-    opencode_release = fetch_github_release(OPENCODE_REPO)
-    ohmy_release = fetch_github_release(OHMY_REPO)
+    repo_data = fetch_repo_data(repos, include_info=False)
+    opencode_release, _ = repo_data[OPENCODE_REPO]
+    ohmy_release, _ = repo_data[OHMY_REPO]
 
     result = {
         "opencode": {
@@ -161,94 +436,84 @@ def get_changelog():
         }
     }
 
-    # Save to cache
-    save_cache({'changelog': result})
-
     return result
 
 
-def get_features():
-    """Fetch core features information."""
-    cache = load_cache()
-    if cache and 'features' in cache:
-        print(f"[CACHE] Using cached features")
-        return cache['features']
-
-    print("[FETCH] Returning core features information")
-
-    result = {
-        "opencode": {
-            "description": "Open source AI coding agent for Terminal, Desktop, and IDE",
-            "key_features": [
-                "Multi-model support (Claude, OpenAI, Google, local models via Ollama)",
-                "LSP-Intelligence Engine for type-safe, definition-aware suggestions",
-                "Parallel agent sessions - run multiple agents simultaneously",
-                "Local-first architecture with enterprise-grade privacy",
-                "Plan mode (suggests implementation) and Build mode (direct changes)",
-                "Multiple interfaces: TUI, Desktop App, VS Code Extension"
-            ]
-        },
-        "oh-my-opencode": {
-            "description": "Agent harness with batteries-included orchestration",
-            "key_features": [
-                "Sisyphus: The agent that codes like your team",
-                "Specialized agents: oracle, librarian, explore, frontend-ui-ux",
-                "Enhanced delegation system with category-based routing",
-                "28+ built-in agents and skills",
-                "Zero learning curve for Claude Code users",
-                "Production-tested after $24k tokens spent",
-                "Full Claude Code compatibility layer",
-                "Curated LSP tools, MCP servers, and workflows"
-            ]
-        }
+# Static payloads for the feature and FAQ queries, built once at import
+FEATURES = {
+    "opencode": {
+        "description": "Open source AI coding agent for Terminal, Desktop, and IDE",
+        "key_features": [
+            "Multi-model support (Claude, OpenAI, Google, local models via Ollama)",
+            "LSP-Intelligence Engine for type-safe, definition-aware suggestions",
+            "Parallel agent sessions - run multiple agents simultaneously",
+            "Local-first architecture with enterprise-grade privacy",
+            "Plan mode (suggests implementation) and Build mode (direct changes)",
+            "Multiple interfaces: TUI, Desktop App, VS Code Extension"
+        ]
+    },
+    "oh-my-opencode": {
+        "description": "Agent harness with batteries-included orchestration",
+        "key_features": [
+            "Sisyphus: The agent that codes like your team",
+            "Specialized agents: oracle, librarian, explore, frontend-ui-ux",
+            "Enhanced delegation system with category-based routing",
+            "28+ built-in agents and skills",
+            "Zero learning curve for Claude Code users",
+            "Production-tested after $24k tokens spent",
+            "Full Claude Code compatibility layer",
+            "Curated LSP tools, MCP servers, and workflows"
+        ]
     }
+}
+
+FAQ = {
+    "opencode": {
+        "common_questions": [
+            "Q: How do I update OpenCode?",
+            "A: Run the install script: curl -fsSL https://opencode.ai/install | bash",
+            "Q: How do I configure API keys?",
+            "A: Run /connect command in TUI or set OPENCODE_API_KEY environment variable",
+            "Q: Can I use local models?",
+            "A: Yes! Connect to Ollama or any local LLM provider via standard config",
+            "Q: What's the difference between Plan and Build mode?",
+            "A: Plan mode suggests implementation without changes. Build mode directly modifies files."
+        ]
+    },
+    "oh-my-opencode": {
+        "common_questions": [
+            "Q: How do I install oh-my-opencode?",
+            "A: Run: npm install -g oh-my-opencode@latest",
+            "Q: What is Sisyphus?",
+            "A: Sisyphus is the main agent in oh-my-opencode that orchestrates tasks and delegates to specialists",
+            "Q: Can I use this with Claude Code?",
+            "A: Yes! oh-my-opencode provides full Claude Code compatibility layer",
+            "Q: How do I update from v2 to v3?",
+            "A: See the migration guide in oh-my-opencode repository. Major config changes required."
+        ]
+    }
+}
 
-    # Save to cache
-    save_cache({'features': result})
 
-    return result
+def get_features():
+    """Return core features information."""
+    print("[FETCH] Returning core features information")
+    return FEATURES
 
 
 def get_faq():
-    """Fetch FAQ information."""
-    cache = load_cache()
-    if cache and 'faq' in cache:
-        print(f"[CACHE] Using cached FAQ")
-        return cache['faq']
-
+    """Return FAQ information."""
     print("[FETCH] Returning FAQ information")
+    return FAQ
 
-    result = {
-        "opencode": {
-            "common_questions": [
-                "Q: How do I update OpenCode?",
-                "A: Run the install script: curl -fsSL https://opencode.ai/install | bash",
-                "Q: How do I configure API keys?",
-                "A: Run /connect command in TUI or set OPENCODE_API_KEY environment variable",
-                "Q: Can I use local models?",
-                "A: Yes! Connect to Ollama or any local LLM provider via standard config",
-                "Q: What's the difference between Plan and Build mode?",
-                "A: Plan mode suggests implementation without changes. Build mode directly modifies files."
-            ]
-        },
-        "oh-my-opencode": {
-            "common_questions": [
-                "Q: How do I install oh-my-opencode?",
-                "A: Run: npm install -g oh-my-opencode@latest",
-                "Q: What is Sisyphus?",
-                "A: Sisyphus is the main agent in oh-my-opencode that orchestrates tasks and delegates to specialists",
-                "Q: Can I use this with Claude Code?",
-                "A: Yes! oh-my-opencode provides full Claude Code compatibility layer",
-                "Q: How do I update from v2 to v3?",
-                "A: See the migration guide in oh-my-opencode repository. Major config changes required."
-            ]
-        }
-    }
-
-    # Save to cache
-    save_cache({'faq': result})
 
-    return result
+# Query type -> handler, resolved once at import
+HANDLERS = {
+    "versions": get_latest_versions,
+    "changelog": get_changelog,
+    "features": get_features,
+    "faq": get_faq
+}
 
 
 def main():
@@ -260,19 +525,13 @@ def main():
 
     query_type = sys.argv[1].lower()
 
-    handlers = {
-        "versions": get_latest_versions,
-        "changelog": get_changelog,
-        "features": get_features,
-        "faq": get_faq
-    }
-
-    if query_type not in handlers:
+    handler = HANDLERS.get(query_type)
+    if handler is None:
         print(f"ERROR: Unknown query type '{query_type}'")
-        print(f"Valid types: {', '.join(handlers.keys())}")
+        print(f"Valid types: {', '.join(HANDLERS.keys())}")
         sys.exit(1)
 
-    result = handlers[query_type]()
+    result = handler()
     print(json.dumps(result, indent=2, ensure_ascii=False))
 
 